@@ -17,14 +17,80 @@ import socket
 import traceback
 import math
 import os
+import struct
+import base64
+import re
+from collections import deque
 
 VERSION = "5.13.2"
 HOST = "127.0.0.1"
 PORT = 7071
 
 # meters/state pacing
-STATE_INTERVAL = 0.25
+STATE_INTERVAL = 0.1  # state tick; per-tier cadence is STATE_TIER_INTERVALS
+STATE_KEYFRAME_INTERVAL = 30.0  # full snapshot every N sec (deltas in between)
+STATE_FORCE_INTERVAL = 5.0  # rescan tracks at least this often even if REAPER reports no change
+STATE_SCAN_BUDGET = 0.002  # sec of track scanning per defer tick; bigger passes span several ticks
+STATE_SCAN_MAX_RESTARTS = 3  # a pass invalidated this often stops restarting on edits (a follow-up pass catches up)
 METER_INTERVAL = 0.020  # ~50Hz (smoother meters)
+METER_DEADBAND_DB = 0.5  # only send a track when its level moved at least this much
+METER_FLOOR_DB = -72.0  # levels below this count as silence for the deadband
+METER_KEYFRAME_INTERVAL = 1.0  # send every track at least this often (late joiners, clip hold)
+# adaptive meter rate: full rate while playing/recording, armed, monitoring
+# input or with signal, idle rate otherwise; backs off while socket writes
+# would block
+METER_RATE_MAX = 1.0 / METER_INTERVAL
+METER_RATE_IDLE = 5.0
+METER_RATE_MIN = 2.0  # floor while backing off
+METER_ACTIVE_DB = -60.0  # any track above this counts as signal activity
+METER_ACTIVITY_HOLD = 2.0  # sec at full rate after the last activity
+METER_RATE_DECAY = 0.9  # per meter tick, when slowing down
+# meter source: "api" (Track_GetPeakInfo & co.) or "gmem" (RM_Meter collector
+# instances publishing into shared memory, see Effects/RM_Meter.jsfx)
+METER_SOURCE = "api"
+TELEMETRY_ENABLED = True  # sample RM_* "Z Telemetry" sliders at meter cadence
+TELEMETRY_KEYFRAME_INTERVAL = 1.0  # resend unchanged telemetry this often
+# inbound commands: received lines are queued and drained under a per-tick
+# budget so a burst (fader drag, reconnect flood) can't stall REAPER's UI
+CMD_BUDGET = 0.004  # sec of command handling per defer tick
+CMD_MAX_PER_TICK = 64
+RX_MAX_READS = 16  # recv() calls per tick
+RX_MAX_LINE = 1 << 20  # bytes; longer unterminated input is dropped
+TX_MAX_BACKLOG = 8 << 20  # unsent bytes before the connection is dropped and resynced
+# FX parameter subscriptions (subscribeFxParams): pushed value deltas
+FX_SUB_RATE = 10.0  # Hz, unless the subscriber asks for another rate
+FX_SUB_RATE_MIN = 1.0
+FX_SUB_RATE_MAX = 30.0
+FX_SUB_MAX = 8  # concurrent subscriptions
+FX_SUB_BUDGET = 0.003  # sec of parameter polling per defer tick
+# RM_EQ2/EQ4 spectrum subscriptions (subscribeSpectrum)
+SPECTRUM_RATE = 15.0  # Hz, unless the subscriber asks for another rate
+SPECTRUM_RATE_MIN = 1.0
+SPECTRUM_RATE_MAX = 30.0
+SPECTRUM_SUB_MAX = 4
+SPECTRUM_BIN_RE = re.compile(r"\bspec\s*(\d+)\s*$", re.I)
+# log file (RemoteMixer.log next to the script)
+LOG_LEVEL = "info"  # debug, info, warn or error
+LOG_FLUSH_INTERVAL = 0.5  # sec between appends to the log file
+LOG_MAX_PENDING = 2000  # unwritten lines kept between flushes; more are counted and dropped
+LOG_MAX_BYTES = 1 << 20  # rotate when the log would grow past this
+LOG_BACKUPS = 3  # RemoteMixer.log.1 .. .3
+LOG_RING = 500  # recent lines kept in memory for reqLog
+# tick profiler: per-phase durations of loop(), pushed in a "stats" message
+PROFILE_ENABLED = True
+PROFILE_API_CALLS = False  # count RPR_* calls per phase (wraps the API; small per-call cost)
+PROFILE_TICK_BUDGET = 0.010  # sec; a tick doing more work than this counts as an overrun
+PROFILE_HIST_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 33.0, 66.0)  # bucket upper bounds
+STATS_INTERVAL = 5.0  # sec between pushed stats messages (0 = only on reqStats)
+# RPR_* call tracer: per-function calls and time (setApiTrace / reqApiTrace)
+API_TRACE = False  # trace from startup
+API_TRACE_TOP = 20  # functions in a report
+API_TRACE_LOG_INTERVAL = 10.0  # sec between ranked reports in the log while tracing (0 = off)
+# traffic capture journal for rm_replay.py (setCapture)
+CAPTURE_ENABLED = False  # capture from startup
+CAPTURE_FLUSH_INTERVAL = 1.0  # sec between appends to the journal
+CAPTURE_MAX_BUFFER = 256 << 10  # buffered bytes that force an early append
+CAPTURE_MAX_BYTES = 64 << 20  # journal size at which the capture stops
 
 # --- REAPER API shim ---
 # REAPER injects RPR_* functions into globals.
@@ -68,6 +134,13 @@ def _now():
     except Exception:
         return 0.0
 
+def _clock():
+    # monotonic, high resolution; for measuring main-thread work
+    try:
+        return time.perf_counter()
+    except Exception:
+        return _now()
+
 def _log_path():
     # __file__ may be undefined in REAPER; try resource path
     try:
@@ -87,15 +160,91 @@ def _log_path():
 
 LOG_PATH = _log_path()
 
-def log(*a):
-    try:
+# --- logging ---
+# log() only formats the line into an in-memory ring (LOG_RING lines, served by
+# reqLog) and a pending list; flush_log() appends the pending lines to
+# LOG_PATH at most every LOG_FLUSH_INTERVAL (called from loop()), so a burst
+# of log lines costs one file write. The file is rotated to LOG_PATH.1 ..
+# LOG_PATH.<LOG_BACKUPS> once it would grow past LOG_MAX_BYTES. Lines below
+# LOG_LEVEL are dropped.
+LOG_LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+log_ring = deque(maxlen=LOG_RING)  # (ts, level, text)
+log_pending = []
+log_dropped = 0  # lines not written because log_pending was full
+log_size = None  # LOG_PATH size as of the last flush (None: not looked at yet)
+log_flushed = 0.0
+
+def _log(level, a):
+    global log_dropped
+    try:
+        if LOG_LEVELS.get(level, 20) < LOG_LEVELS.get(LOG_LEVEL, 20):
+            return
+        ts = time.time()
         s = " ".join([str(x) for x in a])
-        line = "[%s] %s\n" % (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), s)
-        with open(LOG_PATH, "a", encoding="utf-8", errors="replace") as f:
-            f.write(line)
+        log_ring.append((ts, level, s))
+        if len(log_pending) >= LOG_MAX_PENDING:
+            log_dropped += 1
+            return
+        log_pending.append("[%s] %s%s\n" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)),
+                                            "" if level == "info" else level.upper() + " ", s))
     except Exception:
         pass
 
+def log(*a):
+    _log("info", a)
+
+def log_debug(*a):
+    _log("debug", a)
+
+def log_warn(*a):
+    _log("warn", a)
+
+def log_error(*a):
+    _log("error", a)
+
+def _rotate_log():
+    for i in range(LOG_BACKUPS - 1, 0, -1):
+        src = "%s.%d" % (LOG_PATH, i)
+        if os.path.exists(src):
+            os.replace(src, "%s.%d" % (LOG_PATH, i + 1))
+    if LOG_BACKUPS > 0:
+        os.replace(LOG_PATH, LOG_PATH + ".1")
+    else:
+        os.remove(LOG_PATH)
+
+def flush_log(force=False):
+    """Append pending lines to LOG_PATH (rotating first if needed)."""
+    global log_dropped, log_size, log_flushed
+    now = time.time()
+    if not log_pending or (not force and now - log_flushed < LOG_FLUSH_INTERVAL):
+        return
+    log_flushed = now
+    if log_dropped:
+        log_pending.append("[%s] WARN %d log lines dropped\n"
+                           % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)), log_dropped))
+        log_dropped = 0
+    data = "".join(log_pending).encode("utf-8", "replace")
+    del log_pending[:]
+    try:
+        if log_size is None:
+            log_size = os.path.getsize(LOG_PATH) if os.path.exists(LOG_PATH) else 0
+        if log_size and log_size + len(data) > LOG_MAX_BYTES:
+            _rotate_log()
+            log_size = 0
+        with open(LOG_PATH, "ab") as f:
+            f.write(data)
+        log_size += len(data)
+    except Exception:
+        log_size = None
+
+def recent_log(lines=None, level=None):
+    """Newest ring entries (oldest first), optionally only from level up."""
+    floor = LOG_LEVELS.get(level, 0) if level else 0
+    out = [{"ts": ts, "level": lv, "msg": s} for ts, lv, s in log_ring if LOG_LEVELS.get(lv, 20) >= floor]
+    if lines is not None and lines >= 0:
+        out = out[len(out) - min(len(out), lines):]
+    return out
+
 def _as_str(x):
     try:
         if x is None:
@@ -218,29 +367,393 @@ def _safe_json(obj):
         except Exception:
             return "{}"
 
-def _send(sock, obj):
+# --- tick profiler ---
+# loop() marks the end of each phase with prof_phase(); durations go into
+# fixed-size histograms (PROFILE_HIST_MS buckets, exact max), so p50/p95 are
+# bucket upper bounds. "send" is the time spent in _send() (encoding and the
+# immediate write) during the tick and overlaps the phases that sent; "flush"
+# is the final write of whatever is still queued. "gap" is the time between
+# two loop() calls: a long gap with a short tick means REAPER itself was busy.
+# Histograms and byte counts cover the window since the last pushed stats
+# message; "ticks" and "overruns" also keep running totals.
+PROFILE_PHASES = ("recv", "commands", "state", "meter", "subs", "flush", "send", "tick", "gap")
+prof_hist = {}
+prof_bytes = {}  # message type -> [messages, bytes]
+prof_totals = {"ticks": 0, "overruns": 0}
+prof_window_start = 0.0
+prof_tick_start = None
+prof_send_acc = 0.0
+
+def _hist_new():
+    return {"n": 0, "sum": 0.0, "max": 0.0, "api": 0, "over": 0, "b": [0] * (len(PROFILE_HIST_MS) + 1)}
+
+def _hist_add(h, ms, api=0):
+    h["n"] += 1
+    h["sum"] += ms
+    h["api"] += api
+    if ms > h["max"]:
+        h["max"] = ms
+    i = 0
+    for edge in PROFILE_HIST_MS:
+        if ms <= edge:
+            break
+        i += 1
+    h["b"][i] += 1
+
+def _hist_pct(h, q):
+    if not h["n"]:
+        return 0.0
+    want = q * h["n"]
+    seen = 0
+    for i, c in enumerate(h["b"]):
+        seen += c
+        if seen >= want and c:
+            return min(PROFILE_HIST_MS[i], h["max"]) if i < len(PROFILE_HIST_MS) else h["max"]
+    return h["max"]
+
+def reset_profile_window():
+    global prof_window_start
+    prof_hist.clear()
+    for ph in PROFILE_PHASES:
+        prof_hist[ph] = _hist_new()
+    prof_bytes.clear()
+    prof_window_start = _now()
+
+def prof_mark():
+    return (_clock(), api_calls[0])
+
+def prof_tick_begin():
+    """Start of a loop() tick; returns the mark for the first phase."""
+    global prof_tick_start, prof_send_acc
+    mark = prof_mark()
+    if PROFILE_ENABLED:
+        if prof_tick_start is not None:
+            _hist_add(prof_hist["gap"], (mark[0] - prof_tick_start[0]) * 1000.0)
+        prof_send_acc = 0.0
+    prof_tick_start = mark
+    return mark
+
+def prof_phase(phase, mark):
+    """Record the phase that started at mark; returns the mark for the next one."""
+    if not PROFILE_ENABLED:
+        return mark
+    now = prof_mark()
+    _hist_add(prof_hist[phase], (now[0] - mark[0]) * 1000.0, now[1] - mark[1])
+    return now
+
+def prof_tick_end():
+    if not PROFILE_ENABLED or prof_tick_start is None:
+        return
+    now = prof_mark()
+    dt = now[0] - prof_tick_start[0]
+    _hist_add(prof_hist["tick"], dt * 1000.0, now[1] - prof_tick_start[1])
+    _hist_add(prof_hist["send"], prof_send_acc * 1000.0)
+    prof_totals["ticks"] += 1
+    if dt >= PROFILE_TICK_BUDGET:
+        prof_totals["overruns"] += 1
+        prof_hist["tick"]["over"] += 1
+
+def _prof_sent(obj, nbytes):
+    t = obj.get("type", "?") if isinstance(obj, dict) else "?"
+    ent = prof_bytes.get(t)
+    if ent is None:
+        ent = prof_bytes[t] = [0, 0]
+    ent[0] += 1
+    ent[1] += nbytes
+
+def profile_stats():
+    phases = {}
+    for ph in PROFILE_PHASES:
+        h = prof_hist.get(ph)
+        if not h or not h["n"]:
+            continue
+        ent = {"n": h["n"], "p50Ms": round(_hist_pct(h, 0.5), 3), "p95Ms": round(_hist_pct(h, 0.95), 3),
+               "maxMs": round(h["max"], 3), "meanMs": round(h["sum"] / h["n"], 3), "hist": list(h["b"])}
+        if api_mode and ph not in ("send", "gap"):
+            ent["apiCalls"] = h["api"]
+        if ph == "tick":
+            ent["overruns"] = h["over"]
+        phases[ph] = ent
+    return {"enabled": PROFILE_ENABLED, "apiCounting": api_mode is not None,
+            "windowSec": round(_now() - prof_window_start, 3),
+            "budgetMs": PROFILE_TICK_BUDGET * 1000.0, "histMs": list(PROFILE_HIST_MS),
+            "ticks": prof_totals["ticks"], "overruns": prof_totals["overruns"],
+            "phases": phases,
+            "bytes": dict((t, {"msgs": m, "bytes": b}) for t, (m, b) in prof_bytes.items())}
+
+reset_profile_window()
+
+# --- RPR_* call wrappers ---
+# Opt-in instrumentation of the REAPER API: the RPR_* globals are replaced by
+# wrappers (module functions look them up at call time, so every helper goes
+# through them) and restored when instrumentation is switched off.
+#   "count": api_calls only, for the per-phase counts of the tick profiler
+#   "trace": also calls, cumulative and max time per function in api_trace
+# The trace window restarts with every periodic log report (API_TRACE_LOG_INTERVAL)
+# or on reqApiTrace {"reset": true}.
+api_calls = [0]  # RPR_* calls made through the wrappers
+api_originals = {}  # name -> unwrapped function while wrapped
+api_mode = None  # None, "count" or "trace"
+api_count_on = False  # wanted by the profiler (setProfile apiCalls)
+api_trace_on = False  # wanted by setApiTrace
+api_trace = {}  # name -> [calls, total sec, max sec]
+api_trace_start = 0.0
+api_trace_logged = 0.0
+
+def _count_api(fn):
+    def call(*a):
+        api_calls[0] += 1
+        return fn(*a)
+    return call
+
+def _trace_api(fn, ent):
+    clock = time.perf_counter
+    def call(*a):
+        api_calls[0] += 1
+        t0 = clock()
+        try:
+            return fn(*a)
+        finally:
+            dt = clock() - t0
+            ent[0] += 1
+            ent[1] += dt
+            if dt > ent[2]:
+                ent[2] = dt
+    return call
+
+def _apply_api_wrappers():
+    global api_mode
+    mode = "trace" if api_trace_on else ("count" if api_count_on else None)
+    if mode == api_mode:
+        return
+    g = globals()
+    if api_originals:
+        g.update(api_originals)
+        api_originals.clear()
+    if mode is not None:
+        for name, fn in list(g.items()):
+            if name.startswith("RPR_") and callable(fn):
+                api_originals[name] = fn
+                if mode == "trace":
+                    g[name] = _trace_api(fn, api_trace.setdefault(name[4:], [0, 0.0, 0.0]))
+                else:
+                    g[name] = _count_api(fn)
+    api_mode = mode
+
+def set_api_counting(on):
+    """Count RPR_* calls for the tick profiler."""
+    global api_count_on
+    api_count_on = bool(on)
+    _apply_api_wrappers()
+
+def set_api_tracing(on):
+    """Time every RPR_* call per function (implies counting)."""
+    global api_trace_on
+    if on and not api_trace_on:
+        reset_api_trace()
+    api_trace_on = bool(on)
+    _apply_api_wrappers()
+
+def reset_api_trace():
+    global api_trace_start, api_trace_logged
+    for ent in api_trace.values():
+        ent[0] = 0
+        ent[1] = 0.0
+        ent[2] = 0.0
+    api_trace_start = api_trace_logged = _now()
+
+def api_trace_report(top=None):
+    """Functions ranked by cumulative time in the current trace window."""
+    if top is None:
+        top = API_TRACE_TOP
+    window = max(1e-6, _now() - api_trace_start)
+    rows = [(ent[1], name, ent) for name, ent in api_trace.items() if ent[0]]
+    rows.sort(reverse=True)
+    calls = sum(ent[0] for _, _, ent in rows)
+    total = sum(t for t, _, _ in rows)
+    out = []
+    for t, name, ent in rows[:max(0, int(top))]:
+        out.append({"fn": name, "calls": ent[0], "callsPerSec": round(ent[0] / window, 1),
+                    "ms": round(t * 1000.0, 3), "msPerSec": round(t * 1000.0 / window, 3),
+                    "avgUs": round(t * 1e6 / ent[0], 2), "maxUs": round(ent[2] * 1e6, 1)})
+    return {"type":"apiTrace", "enabled": api_trace_on, "windowSec": round(window, 3),
+            "calls": calls, "callsPerSec": round(calls / window, 1),
+            "ms": round(total * 1000.0, 3), "msPerSec": round(total * 1000.0 / window, 3),
+            "functions": len(rows), "top": out, "ts": _now()}
+
+def log_api_trace(report=None):
+    r = report or api_trace_report()
+    log("[RemoteMixer] API trace: %d calls (%.0f/s), %.1f ms/s over %.1fs"
+        % (r["calls"], r["callsPerSec"], r["msPerSec"], r["windowSec"]))
+    for i, e in enumerate(r["top"]):
+        log("  %2d. %-36s %8d calls %9.1f/s %9.3f ms/s avg %7.2f us max %8.1f us"
+            % (i + 1, e["fn"], e["calls"], e["callsPerSec"], e["msPerSec"], e["avgUs"], e["maxUs"]))
+
+def poll_api_trace(now):
+    """Periodic ranked report to the log while tracing."""
+    if api_trace_on and API_TRACE_LOG_INTERVAL > 0 and now - api_trace_logged >= API_TRACE_LOG_INTERVAL:
+        log_api_trace()
+        reset_api_trace()
+
+# --- send queue ---
+# The socket is non-blocking, so _send() only queues the encoded line and
+# flush_tx() writes whatever the socket accepts, keeping the unsent remainder
+# (a partly written line always finishes before anything else goes out).
+# Entries carry a kind; a newer "state" or per-subscription
+# "spectrum:<guid>:<fx>" entry queued with replace=True drops older unwritten
+# entries of the same kind. Unwritten "meter" frames are dropped by the next
+# meter tick or on overflow; they may have been sparse (only the tracks that
+# moved), so dropping one forces a full keyframe.
+tx_queue = deque()  # [kind, bytes]
+tx_off = 0  # bytes of tx_queue[0] already written
+tx_bytes = 0  # unwritten bytes in tx_queue
+tx_broken = False  # write failed hard or backlog overflowed; reconnect
+tx_stats = {"queuedBytes": 0, "sentBytes": 0, "droppedBytes": 0,
+            "droppedMsgs": 0, "maxBacklog": 0}
+send_stalls = 0  # flushes that stopped because the socket would block
+
+def _drop_tx(kind):
+    """Drop unwritten entries of this kind (never the partly written head)."""
+    global tx_bytes
+    keep = deque()
+    dropped = 0
+    for i, ent in enumerate(tx_queue):
+        if ent[0] == kind and not (i == 0 and tx_off):
+            tx_bytes -= len(ent[1])
+            tx_stats["droppedBytes"] += len(ent[1])
+            tx_stats["droppedMsgs"] += 1
+            dropped += 1
+        else:
+            keep.append(ent)
+    tx_queue.clear()
+    tx_queue.extend(keep)
+    if dropped and kind == "meter":
+        force_meter_keyframe()
+
+def tx_pending(kind=None):
+    if kind is None:
+        return bool(tx_queue)
+    for ent in tx_queue:
+        if ent[0] == kind:
+            return True
+    return False
+
+def reset_tx():
+    global tx_off, tx_bytes, tx_broken
+    tx_queue.clear()
+    tx_off = 0
+    tx_bytes = 0
+    tx_broken = False
+
+def flush_tx(sock):
+    """Write queued data until the socket would block; False if the link is dead."""
+    global tx_off, tx_bytes, tx_broken, send_stalls
+    if tx_broken:
+        return False
+    while tx_queue:
+        data = tx_queue[0][1]
+        try:
+            n = sock.send(memoryview(data)[tx_off:])
+        except (BlockingIOError, socket.timeout):
+            send_stalls += 1
+            return True
+        except Exception:
+            tx_broken = True
+            return False
+        tx_off += n
+        tx_bytes -= n
+        tx_stats["sentBytes"] += n
+        if tx_off < len(data):
+            send_stalls += 1
+            return True
+        tx_queue.popleft()
+        tx_off = 0
+    return True
+
+def _send(sock, obj, kind="msg", replace=False):
+    """Queue one message and try to write it; False if it couldn't be queued."""
+    global tx_bytes, tx_broken, prof_send_acc
+    if tx_broken:
+        return False
+    t0 = _clock()
     try:
         data = (_safe_json(obj) + "\n").encode("utf-8", "replace")
-        sock.sendall(data)
-        return True
     except Exception:
         return False
+    if PROFILE_ENABLED:
+        _prof_sent(obj, len(data))
+    if capture_path is not None:
+        capture_out(obj, len(data))
+    if replace:
+        _drop_tx(kind)
+    tx_queue.append([kind, data])
+    tx_bytes += len(data)
+    tx_stats["queuedBytes"] += len(data)
+    if tx_bytes > TX_MAX_BACKLOG:
+        # meters are cheap to lose; anything else means the peer is stuck
+        _drop_tx("meter")
+        if tx_bytes > TX_MAX_BACKLOG:
+            log_warn("[RemoteMixer] send backlog over %d bytes, reconnecting" % TX_MAX_BACKLOG)
+            tx_broken = True
+            return False
+    if tx_bytes > tx_stats["maxBacklog"]:
+        tx_stats["maxBacklog"] = tx_bytes
+    ok = flush_tx(sock)
+    prof_send_acc += _clock() - t0
+    return ok
+
+def tx_queue_stats():
+    out = dict(tx_stats)
+    out["backlog"] = tx_bytes
+    out["pending"] = len(tx_queue)
+    out["writeStalls"] = send_stalls
+    return out
+
+rx_buf = b""  # bytes after the last newline, carried to the next tick
 
 def _recv_lines(sock):
-    # non-blocking-ish line reader
+    """Complete lines received since the last call.
+
+    Reads until the socket would block (bounded by RX_MAX_READS). A trailing
+    partial line stays in rx_buf and is completed by a later tick, so commands
+    split across TCP segments are not lost. "__EOF__" is appended once the
+    peer closed the connection.
+    """
+    global rx_buf
+    chunks = []
+    eof = False
     try:
         sock.settimeout(0.0)
-        try:
-            data = sock.recv(65536)
-        except BlockingIOError:
-            return []
-        except Exception:
-            return []
-        if not data:
-            return ["__EOF__"]
-        return data.decode("utf-8", "replace").splitlines()
+        for _ in range(RX_MAX_READS):
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, socket.timeout):
+                break
+            except (ConnectionError, OSError):
+                eof = True
+                break
+            if not data:
+                eof = True
+                break
+            chunks.append(data)
     except Exception:
-        return []
+        pass
+    if chunks:
+        rx_buf += b"".join(chunks)
+    lines = []
+    if b"\n" in rx_buf:
+        parts = rx_buf.split(b"\n")
+        rx_buf = parts.pop()
+        for part in parts:
+            lines.append(part.decode("utf-8", "replace"))
+    if len(rx_buf) > RX_MAX_LINE:
+        # no newline in sight; drop rather than grow without bound
+        log_warn("[RemoteMixer] dropping %d bytes of unterminated input" % len(rx_buf))
+        rx_buf = b""
+        cmd_stats["malformed"] += 1
+    if eof:
+        lines.append("__EOF__")
+    return lines
 
 # --- GUID handling ---
 def _guid_to_string(guid_ptr):
@@ -370,6 +883,15 @@ def get_track_rec(track):
     except Exception:
         return False
 
+def get_track_recmon(track):
+    # I_RECMON: 0 = off, 1 = on, 2 = auto (tape style)
+    try:
+        v = RPR_GetMediaTrackInfo_Value(track, "I_RECMON")
+        if isinstance(v, tuple): v=v[0]
+        return int(v)
+    except Exception:
+        return 0
+
 def get_track_recinput(track):
     # I_RECINPUT: <0 = output, >=0 hardware input, 4096.. = MIDI.
     try:
@@ -538,91 +1060,675 @@ def get_recv_names(track):
         pass
     return names
 
-def build_state():
-    # master + tracks
-    tracks = []
-    projName, projPath = get_project_info()
+def _send_link_info(track, cat, i):
+    vol = _pick_num(RPR_GetTrackSendInfo_Value(track, cat, i, "D_VOL"), 1.0)
+    mute = bool(_pick_num(RPR_GetTrackSendInfo_Value(track, cat, i, "B_MUTE"), 0))
+    mode = int(_pick_num(RPR_GetTrackSendInfo_Value(track, cat, i, "I_SENDMODE"), 0))
+    src_chan = int(_pick_num(RPR_GetTrackSendInfo_Value(track, cat, i, "I_SRCCHAN"), 0))
+    dst_chan = int(_pick_num(RPR_GetTrackSendInfo_Value(track, cat, i, "I_DSTCHAN"), 0))
+    return float(vol), mute, mode, src_chan, dst_chan
+
+def _routing_steps(entries, routing):
+    """One routing pass over all tracks; yields after each track.
+
+    entries: [(track, guid, name)] in project order.
+    Fills routing: {guid: {"sendSlots","recvSlots","sendDetails","recvDetails"}}.
+
+    REAPER stores a send as a receive on the destination track and numbers a
+    source's sends in destination-track order, so walking every receive once
+    yields both sides with the indices Set*SendInfo expects. A track whose
+    derived send count disagrees with GetTrackNumSends falls back to
+    get_send_details().
+    """
+    peers = {}
+    for tr, guid, name in entries:
+        peers[_as_str(tr)] = (guid, name)
+    sends = {}
+    recvs = {}
+    for tr, guid, name in entries:
+        sends[guid] = []
+
+    for tr, guid, name in entries:
+        out = []
+        try:
+            recv_cnt = RPR_GetTrackNumSends(tr, -1)
+            if isinstance(recv_cnt, tuple): recv_cnt = recv_cnt[0]
+            recv_cnt = int(recv_cnt)
+        except Exception:
+            recv_cnt = 0
+        for i in range(recv_cnt):
+            try:
+                src = RPR_GetTrackSendInfo_Value(tr, -1, i, "P_SRCTRACK")
+                if isinstance(src, tuple): src = src[0]
+                vol, mute, mode, src_chan, dst_chan = _send_link_info(tr, -1, i)
+            except Exception:
+                continue
+            if src:
+                peer = peers.get(_as_str(src))
+                src_guid, src_name = peer if peer else (track_guid(src), get_track_name(src))
+            else:
+                src_guid, src_name = "", ("Return %d" % (i+1))
+            out.append({
+                "index": i,
+                "srcGuid": src_guid,
+                "srcName": src_name,
+                "vol": vol,
+                "mute": mute,
+                "srcChan": src_chan,
+                "dstChan": dst_chan,
+                "srcCh": _chan_pair_label(src_chan),
+                "dstCh": _chan_pair_label(dst_chan),
+            })
+            lst = sends.get(src_guid)
+            if lst is not None:
+                lst.append({
+                    "index": len(lst),
+                    "destGuid": guid,
+                    "destName": name,
+                    "vol": vol,
+                    "mute": mute,
+                    "mode": mode,
+                    "srcChan": src_chan,
+                    "dstChan": dst_chan,
+                    "srcCh": _chan_pair_label(src_chan),
+                    "dstCh": _chan_pair_label(dst_chan),
+                })
+        recvs[guid] = out
+        yield
+
+    for tr, guid, name in entries:
+        sd = sends[guid]
+        try:
+            send_cnt = RPR_GetTrackNumSends(tr, 0)
+            if isinstance(send_cnt, tuple): send_cnt = send_cnt[0]
+            if int(send_cnt) != len(sd):
+                sd = get_send_details(tr)
+        except Exception:
+            pass
+        rd = recvs.get(guid, [])
+        routing[guid] = {
+            "sendSlots": [d["destName"] for d in sd],
+            "recvSlots": [d["srcName"] for d in rd],
+            "sendDetails": sd,
+            "recvDetails": rd,
+        }
+        yield
 
-    try:
-        n = RPR_CountTracks(0)
-        if isinstance(n, tuple): n=n[0]
-        n = int(n)
-    except Exception:
-        n = 0
+def scan_routing(entries):
+    """Blocking routing pass (see _routing_steps)."""
+    routing = {}
+    for _ in _routing_steps(entries, routing):
+        pass
+    return routing
+
+# --- state tiers ---
+# Track fields are refreshed in tiers with their own cadence and dirty flag:
+#   hot     - mixer values (vol/pan/mute/solo/rec/recMon)
+#   routing - sends/receives plus FX chain status
+#   meta    - name, color, folder layout, spacer, rec input, project name/path
+# Fields of tiers not refreshed on a pass are carried over from the last one.
+STATE_TIERS = ("hot", "routing", "meta")
+STATE_TIER_INTERVALS = {"hot": 0.1, "routing": 0.5, "meta": 2.0}
+TIER_FIELDS = {"hot": ("vol", "pan", "mute", "solo", "rec", "recMon"),
+               "routing": ("fxCount", "fxAllOff", "sendSlots", "recvSlots", "sendDetails", "recvDetails"),
+               "meta": ("name", "recInput", "folderDepth", "folderCompact", "indent", "color", "spacerAbove")}
+
+track_cache = {}    # guid -> last built track dict
+track_order = []    # guids in project order as of the last pass
+handle_guids = {}   # str(MediaTrack*) -> guid, so partial passes skip guidToString
+master_cache = None
+project_cache = ("Untitled", "")
+built_tiers = ()    # tiers actually refreshed by the last build_state()
+tier_gen = dict((t, 0) for t in STATE_TIERS)  # bumped whenever a pass publishes fresh tier values
+
+def _read_hot(track):
+    return {
+        "vol": get_track_vol(track),
+        "pan": get_track_pan(track),
+        "mute": get_track_mute(track),
+        "solo": get_track_solo(track),
+        "rec": get_track_rec(track),
+        "recMon": get_track_recmon(track),
+    }
+
+def _read_meta(track):
+    depth, compact, indent = track_folder_info(track)
+    return {
+        "name": get_track_name(track),
+        "recInput": get_track_recinput(track),
+        "folderDepth": int(depth),
+        "folderCompact": int(compact),
+        "indent": int(indent),
+        "color": track_color_hex(track),
+        "spacerAbove": bool(_has_visual_spacer(track)),
+    }
+
+def _build_master(tiers):
+    m = RPR_GetMasterTrack(0)
+    if isinstance(m, tuple): m = m[0]
+    prev = master_cache
+    master = {
+        "kind":"master",
+        "guid": "MASTER",
+        "id":"0",
+        "idx": 0,
+        "name":"MASTER",
+        "vol": get_track_vol(m) if "hot" in tiers or not prev else prev["vol"],
+        "pan": 0.0,
+        "mute": get_track_mute(m) if "hot" in tiers or not prev else prev["mute"],
+        "solo": False,
+        "rec": False,
+        "recMon": 0,
+        "fxCount": 0,
+        "fxAllOff": False,
+        "sendSlots": [],
+        "recvSlots": [],
+        "sendDetails": [],
+        "recvDetails": [],
+        "color": track_color_hex(m) if "meta" in tiers or not prev else prev["color"],
+        "folderDepth": 0,
+        "indent": 0
+    }
+    if "routing" in tiers or not prev:
+        master["fxCount"] = get_fx_count(m)
+        master["fxAllOff"] = get_fx_all_off(m)
+    else:
+        master["fxCount"] = prev["fxCount"]
+        master["fxAllOff"] = prev["fxAllOff"]
+    return master
+
+def _state_steps(job):
+    """Generator for one state pass; yields after each unit of per-track work.
+
+    Refreshes the tiers in job["tiers"]; a pass that finds the track list
+    changed (added/removed/reordered tracks) is promoted to a full pass, or
+    gives up (job["aborted"]) when it is a job["partial"] one. Module caches
+    are only updated after the last yield, so a pass abandoned half-way leaves
+    no trace. The state document ends up in job["result"].
+    """
+    global track_cache, track_order, handle_guids, master_cache, project_cache, built_tiers
+    tiers = set(job["tiers"])
+    full = tiers >= set(STATE_TIERS) or not track_cache
+    if full and job["partial"]:
+        job["aborted"] = True
+        return
+    n = _count_tracks()
+    job["total"] = (n if full else 0) + n * (3 if full or "routing" in tiers else 1)
+
+    # track list; partial passes map handles to cached GUIDs
+    listing = None
+    if not full:
+        listing = []
+        for i in range(n):
+            tr = RPR_GetTrack(0, i)
+            if isinstance(tr, tuple): tr=tr[0]
+            if not tr:
+                continue
+            guid = handle_guids.get(_as_str(tr))
+            if guid is None:
+                listing = None
+                break
+            listing.append((tr, guid))
+        if listing is not None and [g for _, g in listing] != track_order:
+            listing = None
+    if listing is None and job["partial"]:
+        job["aborted"] = True
+        return
+    if listing is None:
+        full = True
+        tiers = set(STATE_TIERS)
+        listing = []
+        for i in range(n):
+            tr = RPR_GetTrack(0, i)
+            if isinstance(tr, tuple): tr=tr[0]
+            if not tr:
+                continue
+            listing.append((tr, _track_guid_str(tr)))
+            yield
+    job["total"] = job["done"] + len(listing) * (3 if "routing" in tiers else 1)
+
+    if "meta" in tiers:
+        project = get_project_info()
+    else:
+        project = project_cache
 
     # master
-    master = None
     try:
-        m = RPR_GetMasterTrack(0)
-        if isinstance(m, tuple): m = m[0]
-        master = {
-            "kind":"master",
-            "guid": "MASTER",
-            "id":"0",
-            "idx": 0,
-            "name":"MASTER",
-            "vol": get_track_vol(m),
-            "pan": 0.0,
-            "mute": get_track_mute(m),
-            "solo": False,
-            "rec": False,
-            "fxCount": get_fx_count(m),
-            "fxAllOff": get_fx_all_off(m),
-            "sendSlots": [],
-            "recvSlots": [],
-            "sendDetails": [],
-            "recvDetails": [],
-            "color": track_color_hex(m),
-            "folderDepth": 0,
-            "indent": 0
-        }
+        master = _build_master(tiers)
     except Exception:
         master = None
 
     # normal tracks
-    for i in range(n):
-        tr = RPR_GetTrack(0, i)
-        if isinstance(tr, tuple): tr=tr[0]
-        if not tr:
-            continue
-        depth, compact, indent = track_folder_info(tr)
-        name = get_track_name(tr)
-        has_spacer = _has_visual_spacer(tr)
+    tracks = []
+    index = {}
+    guids = {}
+    entries = []
+    collectors = {}
+    telemetry = {}
+    telemetry_seen = set()
+    for i, (tr, guid) in enumerate(listing):
+        index[guid] = tr
+        guids[_as_str(tr)] = guid
+        prev = None if full else track_cache.get(guid)
         t = {
             "kind":"track",
-            "guid": track_guid(tr),
+            "guid": guid,
             "id": str(i+1),
             "idx": i+1,
-            "name": name,
-            "vol": get_track_vol(tr),
-            "pan": get_track_pan(tr),
-            "mute": get_track_mute(tr),
-            "solo": get_track_solo(tr),
-            "rec": get_track_rec(tr),
-            "recInput": get_track_recinput(tr),
-            "fxCount": get_fx_count(tr),
-            "fxAllOff": get_fx_all_off(tr),
-            "sendSlots": get_send_names(tr),
-            "recvSlots": get_recv_names(tr),
-            "sendDetails": get_send_details(tr),
-            "recvDetails": get_recv_details(tr),
-            "folderDepth": int(depth),
-            "folderCompact": int(compact),
-            "indent": int(indent),
-            "color": track_color_hex(tr),
-            "spacerAbove": bool(has_spacer),
         }
+        if prev is not None:
+            t.update(prev)
+            t["id"] = str(i+1)
+            t["idx"] = i+1
+        if "hot" in tiers:
+            t.update(_read_hot(tr))
+        if "meta" in tiers:
+            t.update(_read_meta(tr))
+        if "routing" in tiers:
+            t["fxCount"] = get_fx_count(tr)
+            t["fxAllOff"] = get_fx_all_off(tr)
+            entries.append((tr, guid, t["name"]))
+            if meter_source == "gmem":
+                collectors[guid] = find_meter_fx(tr)
+            if TELEMETRY_ENABLED and t["fxCount"] > 0:
+                telemetry[guid] = find_telemetry_fx(tr, t["fxCount"], telemetry_seen)
         tracks.append(t)
+        yield
+
+    if "routing" in tiers:
+        routing = {}
+        for _ in _routing_steps(entries, routing):
+            yield
+        for t in tracks:
+            r = routing.get(t["guid"])
+            if r:
+                t.update(r)
+
+    # publish
+    if job["partial"] and [t["guid"] for t in tracks] != track_order:
+        job["aborted"] = True  # a full pass changed the track list meanwhile
+        return
+    # another pass may have published while this one ran: tiers it refreshed
+    # later, and tiers this one doesn't refresh, come from the current caches
+    for tier in STATE_TIERS:
+        if tier in tiers and tier_gen[tier] == job["gens"][tier]:
+            tier_gen[tier] += 1
+            continue
+        keys = TIER_FIELDS[tier]
+        for t in tracks:
+            cur = track_cache.get(t["guid"])
+            if cur is not None:
+                for k in keys:
+                    if k in cur:
+                        t[k] = cur[k]
+        if master is not None and master_cache is not None:
+            for k in keys:
+                if k in master_cache and k in master:
+                    master[k] = master_cache[k]
+        if tier == "meta":
+            project = project_cache
+    set_guid_index(index, len(listing))
+    handle_guids = guids
+    master_cache = master
+    project_cache = project
+    track_cache = dict((t["guid"], t) for t in tracks)
+    track_order = [t["guid"] for t in tracks]
+    built_tiers = tuple(t for t in STATE_TIERS if t in tiers)
+    if "routing" in tiers and meter_source == "gmem":
+        try:
+            m = RPR_GetMasterTrack(0)
+            if isinstance(m, tuple): m = m[0]
+            collectors["MASTER"] = find_meter_fx(m)
+            handles = dict(index)
+            handles["MASTER"] = m
+            assign_meter_slots(collectors, handles)
+        except Exception:
+            pass
+    if "routing" in tiers and TELEMETRY_ENABLED:
+        try:
+            if master and master["fxCount"] > 0:
+                m = RPR_GetMasterTrack(0)
+                if isinstance(m, tuple): m = m[0]
+                telemetry["MASTER"] = find_telemetry_fx(m, master["fxCount"], telemetry_seen)
+            set_telemetry_sources(telemetry, telemetry_seen)
+        except Exception:
+            pass
 
-    return {"type":"state",
+    transport = job.get("transport")
+    job["result"] = {"type":"state",
             "master": master,
             "tracks": tracks,
-            "projectName": projName,
-            "projectPath": projPath,
-            "transport": get_transport_state(),
+            "projectName": project[0],
+            "projectPath": project[1],
+            "transport": transport if transport is not None else get_transport_state(),
             "ts": _now(),
             "version": VERSION}
 
+def new_state_job(transport=None, tiers=None, partial=False):
+    job = {"tiers": tuple(STATE_TIERS if tiers is None else tiers), "transport": transport,
+           "result": None, "done": 0, "total": 0, "ticks": 0, "cpu": 0.0, "restarts": 0,
+           "partial": partial, "aborted": False, "gens": dict(tier_gen)}
+    job["gen"] = _state_steps(job)
+    return job
+
+def run_state_job(job, budget=None):
+    """Advance a state pass for up to `budget` seconds (None = to the end).
+
+    Returns True once the pass is over: job["result"] holds the finished
+    document, or job["aborted"] is set.
+    """
+    t0 = _clock()
+    job["ticks"] += 1
+    for _ in job["gen"]:
+        job["done"] += 1
+        if budget is not None and _clock() - t0 >= budget:
+            break
+    job["cpu"] += _clock() - t0
+    return job["result"] is not None or job["aborted"]
+
+def build_state(transport=None, tiers=None):
+    """Build the whole state document in one go (see _state_steps)."""
+    job = new_state_job(transport, tiers)
+    run_state_job(job)
+    return job["result"]
+
+
+# --- change detection ---
+# GetProjectStateChangeCount moves on every undo-able edit. API writes (our own
+# control commands) and automation playback don't bump it, so commands mark
+# their tiers dirty and playback keeps the hot/routing tiers live.
+tier_dirty = dict((t, True) for t in STATE_TIERS)
+tier_cmd_dirty = dict((t, False) for t in STATE_TIERS)  # dirtied by one of our commands
+tier_last = dict((t, 0.0) for t in STATE_TIERS)
+last_change_sig = None
+last_scanned_state = None
+
+# Which tiers a control command can affect (unknown commands: all tiers).
+CMD_STATE_TIERS = {
+    "reqState": (), "reqStats": (), "setMeterFormat": (), "batch": (),
+    "setProfile": (), "setApiTrace": (), "reqApiTrace": (), "setCapture": (), "reqLog": (),
+    "setMeterSource": ("routing",), "installMeterFx": ("routing",), "reqFxList": (), "reqFxParams": (), "transport": (), "setBpm": (),
+    "setFxParam": (), "showFxChain": (), "subscribeFxParams": (), "unsubscribeFxParams": (),
+    "subscribeSpectrum": (), "unsubscribeSpectrum": (), "searchFxCatalog": (),
+    "setVol": ("hot",), "setPan": ("hot",), "setMute": ("hot",), "setSolo": ("hot",),
+    "setRec": ("hot",),
+    "setRecInput": ("meta",), "renameTrack": ("meta",), "setTrackColor": ("meta",),
+    "setSpacer": ("meta",), "addSpacer": ("meta",),
+    "setSendVol": ("routing",), "setSendMute": ("routing",), "setSendMode": ("routing",),
+    "setSendSrcChan": ("routing",), "setSendDstChan": ("routing",), "addSend": ("routing",),
+    "setRecvVol": ("routing",), "setRecvMute": ("routing",), "setRecvSrcChan": ("routing",),
+    "setRecvDstChan": ("routing",), "addReturn": ("routing",),
+    "setFxEnabled": ("routing",), "setFxAllEnabled": ("routing",), "deleteFx": ("routing",),
+    "moveFx": ("routing",), "addFx": ("routing",),
+}
+
+def mark_state_dirty(tiers=None):
+    for t in (STATE_TIERS if tiers is None else tiers):
+        tier_dirty[t] = True
+
+def mark_cmd_dirty(typ):
+    global structure_gen
+    tiers = CMD_STATE_TIERS.get(typ)
+    if tiers is None:
+        structure_gen += 1
+    mark_state_dirty(tiers)
+    for t in (STATE_TIERS if tiers is None else tiers):
+        tier_cmd_dirty[t] = True
+
+def project_change_sig():
+    """(active project, change count), or None when the API isn't available."""
+    try:
+        if "RPR_GetProjectStateChangeCount" not in globals():
+            return None
+        cnt = RPR_GetProjectStateChangeCount(0)
+        if isinstance(cnt, tuple): cnt = cnt[0]
+        proj = RPR_EnumProjects(-1, "", 0)
+        if isinstance(proj, tuple): proj = proj[0]
+        return (_as_str(proj), int(cnt))
+    except Exception:
+        return None
+
+def due_state_tiers(now, transport):
+    """Tiers to refresh this tick: dirty (or stale past STATE_FORCE_INTERVAL)
+    and not refreshed more recently than their STATE_TIER_INTERVALS entry.
+
+    A tier dirtied by one of our commands only waits STATE_INTERVAL, so edits
+    made from the remote echo back promptly.
+    """
+    active = transport.get("playing") or transport.get("recording")
+    due = []
+    for t in STATE_TIERS:
+        elapsed = now - tier_last[t]
+        interval = STATE_TIER_INTERVALS.get(t, STATE_INTERVAL)
+        if tier_cmd_dirty[t]:
+            interval = min(interval, STATE_INTERVAL)
+        if elapsed < interval:
+            continue
+        if tier_dirty[t] or elapsed >= STATE_FORCE_INTERVAL or (active and t != "meta"):
+            due.append(t)
+    return due
+
+# --- incremental scanning ---
+# A state pass runs as a job that advance_state() moves forward by at most
+# STATE_SCAN_BUDGET on every defer tick; poll_state() (at STATE_INTERVAL)
+# only schedules passes for due tiers and publishes the last finished
+# document (with fresh transport). While a long routing/meta pass runs, a due
+# hot tier gets its own short partial pass (hot_job) that shares the budget,
+# so mixer values keep moving. Before each slice the main job checks that the
+# project didn't change under it (track count, change count or a structural
+# command) and restarts if it did; after STATE_SCAN_MAX_RESTARTS it only
+# restarts for track list changes and leaves edits to a follow-up pass.
+scan_job = None
+hot_job = None
+scan_stats = {"passes": 0, "restarts": 0, "hotPasses": 0, "lastPassTicks": 0, "lastPassMs": 0.0,
+              "lastSliceMs": 0.0, "maxSliceMs": 0.0}
+structure_gen = 0  # bumped by commands that can add/remove/reorder tracks
+
+def _scan_sig(sig):
+    return (sig, _count_tracks(), structure_gen)
+
+def state_scan_stats():
+    st = dict(scan_stats)
+    st["budgetMs"] = STATE_SCAN_BUDGET * 1000.0
+    st["active"] = scan_job is not None
+    if scan_job is not None:
+        st["tiers"] = list(scan_job["tiers"])
+        st["done"] = scan_job["done"]
+        st["total"] = scan_job["total"]
+        st["ticks"] = scan_job["ticks"]
+    st["hotActive"] = hot_job is not None
+    return st
+
+last_transport = None
+
+def _finish_state_job(job, now):
+    global last_scanned_state
+    if job["aborted"]:
+        return
+    scan_stats["passes"] += 1
+    scan_stats["lastPassTicks"] = job["ticks"]
+    scan_stats["lastPassMs"] = job["cpu"] * 1000.0
+    for t in built_tiers:
+        tier_last[t] = now
+        if t not in job["tiers"]:
+            tier_dirty[t] = False
+            tier_cmd_dirty[t] = False
+    last_scanned_state = job["result"]
+
+def advance_state(now):
+    """Run this tick's slice of the pending state passes."""
+    global scan_job, hot_job
+    if scan_job is None and hot_job is None:
+        return
+    t0 = _clock()
+    sig = project_change_sig()
+    cur = _scan_sig(sig)
+    if hot_job is not None and hot_job["sig"][1:] != cur[1:]:
+        hot_job = None  # track list changed; the main pass handles it
+    if scan_job is not None and scan_job["sig"] != cur:
+        job = scan_job
+        if job["sig"][1:] != cur[1:] or job["restarts"] < STATE_SCAN_MAX_RESTARTS:
+            scan_job = new_state_job(job["transport"], job["tiers"])
+            scan_job["restarts"] = job["restarts"] + 1
+            scan_stats["restarts"] += 1
+        else:
+            # keep going; the edit is picked up by a follow-up pass
+            mark_state_dirty(job["tiers"])
+        scan_job["sig"] = cur
+
+    if hot_job is not None:
+        job = hot_job
+        # half the budget while a main pass waits, so neither starves
+        budget = STATE_SCAN_BUDGET * (0.5 if scan_job is not None else 1.0)
+        if run_state_job(job, budget):
+            hot_job = None
+            if not job["aborted"]:
+                scan_stats["hotPasses"] += 1
+            _finish_state_job(job, now)
+    if scan_job is not None:
+        job = scan_job
+        # whatever the hot pass left (at least one step, so it always moves)
+        if run_state_job(job, max(0.0, STATE_SCAN_BUDGET - (_clock() - t0))):
+            scan_job = None
+            _finish_state_job(job, now)
+    slice_ms = (_clock() - t0) * 1000.0
+    scan_stats["lastSliceMs"] = slice_ms
+    scan_stats["maxSliceMs"] = max(scan_stats["maxSliceMs"], slice_ms)
+
+def poll_state(now):
+    """State document for this state tick (None until the first pass finished).
+
+    Schedules passes for the tiers that may have moved; advance_state() runs
+    them in budgeted slices.
+    """
+    global last_change_sig, scan_job, hot_job, last_transport
+    transport = get_transport_state()
+    last_transport = transport
+    sig = project_change_sig()
+    if sig is None or sig != last_change_sig:
+        mark_state_dirty()
+        last_change_sig = sig
+
+    due = STATE_TIERS if last_scanned_state is None else due_state_tiers(now, transport)
+    if scan_job is None and due:
+        scan_job = new_state_job(transport, due)
+        scan_job["sig"] = _scan_sig(sig)
+        for t in due:
+            tier_dirty[t] = False
+            tier_cmd_dirty[t] = False
+    elif (scan_job is not None and hot_job is None and "hot" in due
+          and scan_job["tiers"] != ("hot",) and last_scanned_state is not None):
+        hot_job = new_state_job(transport, ("hot",), partial=True)
+        hot_job["sig"] = _scan_sig(sig)
+        tier_dirty["hot"] = False
+        tier_cmd_dirty["hot"] = False
+
+    if last_scanned_state is None:
+        return None
+    st = dict(last_scanned_state)
+    st["transport"] = transport
+    st["ts"] = _now()
+    return st
+
+
+# --- state stream (full snapshots + deltas) ---
+# Every state message carries a monotonically increasing "seq". A "stateDelta"
+# also carries "base" (the seq it applies on top of); the server asks for a
+# full snapshot (reqState) when the base doesn't match what it holds.
+STATE_TOP_KEYS = ("projectName", "projectPath", "transport")
+
+state_seq = 0
+state_base = None  # last sent snapshot: {"master":..., "tracks":{guid: dict}, "order":[guid], top keys...}
+
+def reset_state_stream():
+    """Forget the last sent snapshot so the next state message is a full one."""
+    global state_base
+    state_base = None
+
+def _remember_state(st):
+    global state_base
+    tracks = {}
+    order = []
+    for t in st.get("tracks") or []:
+        g = t.get("guid")
+        tracks[g] = t
+        order.append(g)
+    base = {"master": st.get("master"), "tracks": tracks, "order": order}
+    for k in STATE_TOP_KEYS:
+        base[k] = st.get(k)
+    state_base = base
+
+def _diff_fields(old, new):
+    out = {}
+    for k, v in new.items():
+        if k not in old or old[k] != v:
+            out[k] = v
+    return out
+
+def full_state_msg(st=None):
+    """Full snapshot (used for reqState, (re)connects and resyncs)."""
+    global state_seq
+    if st is None:
+        st = build_state()
+    state_seq += 1
+    st["seq"] = state_seq
+    _remember_state(st)
+    return st
+
+def state_delta_msg(st):
+    """Delta against the last sent snapshot, or None when nothing changed.
+
+    Falls back to a full snapshot when there's no baseline yet.
+    """
+    global state_seq
+    if state_base is None:
+        return full_state_msg(st)
+    base = state_base
+    old_tracks = base["tracks"]
+    added = []
+    changed = []
+    order = []
+    new_tracks = {}
+    for t in st.get("tracks") or []:
+        g = t.get("guid")
+        order.append(g)
+        new_tracks[g] = t
+        prev = old_tracks.get(g)
+        if prev is None:
+            added.append(t)
+            continue
+        d = _diff_fields(prev, t)
+        if d:
+            d["guid"] = g
+            changed.append(d)
+    removed = [g for g in base["order"] if g not in new_tracks]
+
+    delta = {}
+    if added:
+        delta["added"] = added
+    if removed:
+        delta["removed"] = removed
+    if changed:
+        delta["changed"] = changed
+    if order != base["order"]:
+        delta["order"] = order
+    if st.get("master") != base["master"]:
+        delta["master"] = st.get("master")
+    for k in STATE_TOP_KEYS:
+        if st.get(k) != base[k]:
+            delta[k] = st.get(k)
+    if not delta:
+        return None
+
+    delta["type"] = "stateDelta"
+    delta["base"] = state_seq
+    state_seq += 1
+    delta["seq"] = state_seq
+    delta["ts"] = st.get("ts", _now())
+    delta["version"] = VERSION
+    _remember_state(st)
+    return delta
+
 
 # --- meters ---
 def _db_to_lin(db):
@@ -795,28 +1901,626 @@ def get_transport_state():
     }
 
 
-def build_meter():
-    frames = []
+def read_meters():
+    """[(guid, pkL, pkR, clipDb)] for master + tracks in project order.
+
+    Tracks are listed live every tick (a handle from an older pass may be
+    gone), but GUIDs come from the state scan's handle map where possible.
+    """
+    levels = []
+    collected = read_meter_collectors() if meter_source == "gmem" else {}
     try:
         # master
         m = RPR_GetMasterTrack(0)
-        pkL, pkR, clip_db = get_track_peaks(m)
-        frames.append({"guid": track_guid(m), "pkL": pkL, "pkR": pkR, "clipDb": clip_db})
+        if isinstance(m, tuple): m = m[0]
+        hit = collected.get("MASTER")
+        pkL, pkR, clip_db = _post_fader(hit, master_cache) if hit else get_track_peaks(m)
+        levels.append(("MASTER", pkL, pkR, clip_db))
     except Exception:
         pass
-    try:
-        n = RPR_CountTracks(0)
-        if isinstance(n, tuple): n=n[0]
-        n=int(n)
-    except Exception:
-        n=0
+    n = _count_tracks()
     for i in range(n):
         tr = RPR_GetTrack(0,i)
         if isinstance(tr, tuple): tr=tr[0]
         if not tr: continue
-        pkL, pkR, clip_db = get_track_peaks(tr)
-        frames.append({"guid": track_guid(tr), "pkL": pkL, "pkR": pkR, "clipDb": clip_db})
-    return {"type":"meter", "frames": frames, "ts": _now(), "version": VERSION}
+        guid = handle_guids.get(_as_str(tr))
+        if guid is None:
+            guid = _track_guid_str(tr)
+        hit = collected.get(guid)
+        if hit:
+            pkL, pkR, clip_db = _post_fader(hit, track_cache.get(guid))
+        else:
+            pkL, pkR, clip_db = get_track_peaks(tr)
+        levels.append((guid, pkL, pkR, clip_db))
+    return levels
+
+# --- gmem meter collectors ---
+# In "gmem" mode every track carrying an RM_Meter instance (last in its FX
+# chain) gets a slot; the JSFX publishes its levels there and read_meters()
+# takes one gmem_read per track instead of the Track_GetPeakInfo /
+# GetTrackUIPeakHoldDB / I_RECARM calls. Collectors sit before the fader, so
+# levels are scaled by the fader value from the state scan (pan ignored).
+# Tracks without a (live) collector keep using the API path.
+METER_GMEM_NAME = "RemoteMixerMeters"
+METER_GMEM_BASE = 16
+METER_GMEM_STRIDE = 2
+METER_GMEM_SLOTS = 1024
+METER_FX_NAME = "RM_Meter"
+
+meter_source = "api"
+meter_slots = {}  # guid -> gmem slot
+gmem_tick = 0
+gmem_hits = 0
+
+def set_meter_source(src):
+    """Switch between "api" and "gmem"; returns the source now in use."""
+    global meter_source
+    if src == "gmem":
+        try:
+            RPR_gmem_attach(METER_GMEM_NAME)
+            meter_source = "gmem"
+        except Exception:
+            meter_source = "api"
+    else:
+        meter_source = "api"
+        meter_slots.clear()
+    mark_state_dirty(("routing",))
+    return meter_source
+
+def find_meter_fx(track):
+    """FX index of the track's RM_Meter collector, or -1."""
+    try:
+        idx = RPR_TrackFX_AddByName(track, METER_FX_NAME, False, 0)
+        if isinstance(idx, tuple): idx = idx[0]
+        return int(idx)
+    except Exception:
+        return -1
+
+def install_meter_fx(track):
+    """Add an RM_Meter collector to the track unless it already has one."""
+    try:
+        idx = RPR_TrackFX_AddByName(track, METER_FX_NAME, False, 1)
+        if isinstance(idx, tuple): idx = idx[0]
+        return int(idx)
+    except Exception:
+        return -1
+
+def assign_meter_slots(collectors, tracks):
+    """collectors: {guid: fx index or -1}; tracks: {guid: MediaTrack}.
+
+    Keeps existing slots stable and writes each slot into its JSFX.
+    """
+    live = dict((g, fx) for g, fx in collectors.items() if fx >= 0)
+    for g in list(meter_slots.keys()):
+        if g not in live:
+            del meter_slots[g]
+    used = set(meter_slots.values())
+    free = (i for i in range(METER_GMEM_SLOTS) if i not in used)
+    for g, fx in live.items():
+        slot = meter_slots.get(g)
+        if slot is None:
+            slot = next(free, None)
+            if slot is None:
+                break
+            meter_slots[g] = slot
+        tr = tracks.get(g)
+        if tr is None:
+            continue
+        try:
+            cur = _pick_num(RPR_TrackFX_GetParam(tr, fx, 0), -1)
+            if int(cur) != slot:
+                RPR_TrackFX_SetParam(tr, fx, 0, slot)
+        except Exception:
+            pass
+
+def read_meter_collectors():
+    """{guid: (pkL, pkR, clipDb)} from collectors that reported since the last tick."""
+    global gmem_tick, gmem_hits
+    out = {}
+    if not meter_slots:
+        return out
+    # values are tagged with the tick they were collected for; accept the
+    # current and the previous one (the JSFX may not have run a block since)
+    ok = (gmem_tick & 255, (gmem_tick - 1) & 255)
+    for guid, slot in meter_slots.items():
+        try:
+            v = RPR_gmem_read(METER_GMEM_BASE + slot * METER_GMEM_STRIDE)
+            v = int(_pick_num(v, 0))
+        except Exception:
+            continue
+        if (v & 255) not in ok:
+            continue
+        clip = (v >> 8) & 255
+        out[guid] = (((v >> 32) & 0xFFFF) / 65535.0,
+                     ((v >> 16) & 0xFFFF) / 65535.0,
+                     clip / 10.0 if clip else None)
+    gmem_tick = (gmem_tick + 1) & 0x7FFFFFFF
+    try:
+        RPR_gmem_write(0, gmem_tick)
+    except Exception:
+        pass
+    gmem_hits = len(out)
+    return out
+
+def _post_fader(hit, t):
+    pkL, pkR, clip_db = hit
+    if t:
+        if t.get("mute"):
+            return 0.0, 0.0, clip_db
+        vol = t.get("vol", 1.0)
+        pkL = min(1.0, pkL * vol)
+        pkR = min(1.0, pkR * vol)
+    return pkL, pkR, clip_db
+
+def build_meter(levels=None, keyframe=True):
+    """JSON meter message (the fallback format)."""
+    if levels is None:
+        levels = read_meters()
+    frames = []
+    for guid, pkL, pkR, clip_db in levels:
+        frames.append({"guid": guid, "pkL": pkL, "pkR": pkR, "clipDb": clip_db})
+    return {"type":"meter", "frames": frames, "keyframe": bool(keyframe), "ts": _now(), "version": VERSION}
+
+# --- meter deadband ---
+# Between keyframes only tracks whose level moved by METER_DEADBAND_DB (or
+# whose clip value changed) are sent; the client keeps the last value for
+# the rest.
+meter_last = {}  # guid -> (dbL, dbR, clip)
+meter_keyframe_due = True
+last_meter_keyframe = 0.0
+
+def _meter_db(v):
+    try:
+        v = float(v)
+        if v <= 0.0:
+            return METER_FLOOR_DB
+        return max(METER_FLOOR_DB, 20.0 * math.log10(v))
+    except Exception:
+        return METER_FLOOR_DB
+
+def force_meter_keyframe():
+    global meter_keyframe_due
+    meter_keyframe_due = True
+
+def meter_changes(levels, now):
+    """(slots, keyframe, peak): slots is [(slot, level)] to send this tick,
+    peak the loudest channel in dB (METER_FLOOR_DB when all are silent)."""
+    global meter_last, meter_keyframe_due, last_meter_keyframe
+    keyframe = meter_keyframe_due or now - last_meter_keyframe >= METER_KEYFRAME_INTERVAL
+    if keyframe:
+        meter_keyframe_due = False
+        last_meter_keyframe = now
+    slots = []
+    seen = {}
+    peak = METER_FLOOR_DB
+    for i, lv in enumerate(levels):
+        guid = lv[0]
+        cur = (_meter_db(lv[1]), _meter_db(lv[2]), _q_clip(lv[3]))
+        peak = max(peak, cur[0], cur[1])
+        prev = meter_last.get(guid)
+        if keyframe or prev is None or prev[2] != cur[2] \
+                or abs(cur[0] - prev[0]) >= METER_DEADBAND_DB \
+                or abs(cur[1] - prev[1]) >= METER_DEADBAND_DB:
+            slots.append((i, lv))
+            seen[guid] = cur
+        else:
+            seen[guid] = prev
+    meter_last = seen
+    return slots, keyframe, peak
+
+# --- meter rate ---
+meter_peak_db = METER_FLOOR_DB  # loudest channel on the last meter tick
+meter_rate = METER_RATE_MAX
+meter_backoff = 1.0
+meter_rate_reason = "start"
+meter_last_active = 0.0
+meter_seen_stalls = 0
+
+def update_meter_rate(now, peak_db=METER_FLOOR_DB):
+    """Pick the meter rate for the next tick from this tick's peak (dB);
+    returns the interval in seconds."""
+    global meter_rate, meter_backoff, meter_rate_reason, meter_last_active, meter_seen_stalls, meter_peak_db
+    tp = last_transport or {}
+    meter_peak_db = peak_db
+    if peak_db > METER_ACTIVE_DB:
+        meter_last_active = now
+    if tp.get("playing") or tp.get("recording"):
+        reason = "transport"
+    elif any(t.get("rec") for t in track_cache.values()):
+        reason = "armed"
+    elif any(t.get("recMon") for t in track_cache.values()):
+        # input monitoring shows the input live, armed or not
+        reason = "monitoring"
+    elif now - meter_last_active < METER_ACTIVITY_HOLD:
+        reason = "signal"
+    else:
+        reason = "idle"
+    target = METER_RATE_IDLE if reason == "idle" else METER_RATE_MAX
+    # jump up at once, ease down
+    if target >= meter_rate:
+        meter_rate = target
+    else:
+        meter_rate = max(target, meter_rate * METER_RATE_DECAY)
+    meter_rate_reason = reason
+
+    if send_stalls != meter_seen_stalls:
+        meter_seen_stalls = send_stalls
+        meter_backoff = max(METER_RATE_MIN / METER_RATE_MAX, meter_backoff * 0.5)
+    elif meter_backoff < 1.0:
+        meter_backoff = min(1.0, meter_backoff * 1.1)
+    return 1.0 / max(METER_RATE_MIN, meter_rate * meter_backoff)
+
+def meter_rate_stats():
+    return {"rateHz": max(METER_RATE_MIN, meter_rate * meter_backoff),
+            "targetHz": meter_rate,
+            "backoff": meter_backoff,
+            "reason": meter_rate_reason,
+            "peakDb": meter_peak_db,
+            "sendStalls": send_stalls,
+            "source": meter_source,
+            "collectors": len(meter_slots),
+            "collectorHits": gmem_hits}
+
+# --- packed meters ---
+# Negotiated with the server (hello advertises METER_FORMATS, the server
+# answers with setMeterFormat). A "meterLayout" message maps frame slots to
+# GUIDs and is re-sent whenever the track order changes; "meterPacked" frames
+# then carry base64 of:
+#   header  <BHH   flags, layout id, slot count
+#   slot    <HHB   pkL, pkR (0..1 -> 0..65535), clip (0 = none, else dB*10, max 25.5)
+# With flags & METER_PACK_SPARSE each slot is prefixed by its uint16 slot index
+# (<HHHB) and only lists the changed tracks.
+METER_FORMATS = ("json", "packed")
+METER_PACK_HEADER = "<BHH"
+METER_PACK_SLOT = "HHB"
+METER_PACK_SPARSE = 1
+
+meter_format = "json"
+meter_layout = []
+meter_layout_id = 0
+meter_layout_sent = False
+
+def set_meter_format(fmt):
+    global meter_format, meter_layout_sent
+    if fmt in METER_FORMATS:
+        meter_format = fmt
+        meter_layout_sent = False
+        force_meter_keyframe()
+
+def _q16(v):
+    try:
+        v = int(float(v) * 65535.0 + 0.5)
+    except Exception:
+        return 0
+    return 0 if v < 0 else (65535 if v > 65535 else v)
+
+def _q8(v):
+    v = int(float(v) * 255.0 + 0.5)
+    return 0 if v < 0 else (255 if v > 255 else v)
+
+def _q_clip(clip_db):
+    if clip_db is None:
+        return 0
+    try:
+        v = int(float(clip_db) * 10.0 + 0.5)
+    except Exception:
+        return 0
+    return 1 if v < 1 else (255 if v > 255 else v)
+
+def meter_layout_msg(guids):
+    """New layout message if the slot order changed (or wasn't sent yet), else None."""
+    global meter_layout, meter_layout_id, meter_layout_sent
+    if meter_layout_sent and guids == meter_layout:
+        return None
+    meter_layout = list(guids)
+    meter_layout_id = (meter_layout_id + 1) & 0xFFFF
+    meter_layout_sent = True
+    force_meter_keyframe()
+    return {"type":"meterLayout", "id": meter_layout_id, "guids": meter_layout, "version": VERSION}
+
+def build_meter_packed(slots, sparse=False):
+    """slots: [(slot, (guid, pkL, pkR, clipDb))]; dense frames must list every slot in order."""
+    vals = []
+    for i, (guid, pkL, pkR, clip_db) in slots:
+        if sparse:
+            vals.append(i)
+        vals.append(_q16(pkL))
+        vals.append(_q16(pkR))
+        vals.append(_q_clip(clip_db))
+    n = len(slots)
+    fmt = METER_PACK_HEADER + ("H" + METER_PACK_SLOT if sparse else METER_PACK_SLOT) * n
+    flags = METER_PACK_SPARSE if sparse else 0
+    data = struct.pack(fmt, flags, meter_layout_id, n, *vals)
+    return {"type":"meterPacked", "data": base64.b64encode(data).decode("ascii"), "ts": _now()}
+
+def meter_msgs(now=None):
+    """(messages, peak dB) for one meter tick; messages are in the negotiated
+    format (may be empty), the peak feeds update_meter_rate()."""
+    if now is None:
+        now = _now()
+    levels = read_meters()
+    msgs = []
+    if meter_format == "packed":
+        lay = meter_layout_msg([lv[0] for lv in levels])
+        if lay is not None:
+            msgs.append(lay)
+    slots, keyframe, peak = meter_changes(levels, now)
+    if not slots:
+        return msgs, peak
+    if meter_format != "packed":
+        msgs.append(build_meter([lv for _, lv in slots], keyframe))
+    else:
+        msgs.append(build_meter_packed(slots, sparse=not keyframe))
+    return msgs, peak
+
+# --- installed FX catalog ---
+# EnumInstalledFX is walked once and kept as a normalized name index (see
+# _norm_fx_name), persisted next to the log so later runs skip the walk. The
+# walk is a job advanced by poll_fx_catalog() under FX_CATALOG_BUDGET per
+# tick, like the state scan; until it finishes lookups see the previous
+# catalog (or none) and addFx falls back to the names it was given.
+# The file is rebuilt when REAPER's version or its plugin cache files
+# (reaper-*plugins*.ini, reaper-jsfx.ini, ...) change, or when it's older than
+# FX_CATALOG_MAX_AGE. addFx resolves its candidates here before trying
+# TrackFX_AddByName; searchFxCatalog answers name lookups from the index.
+FX_CATALOG_PATH = os.path.join(os.path.dirname(LOG_PATH), "RemoteMixer.fxcatalog.json")
+FX_CATALOG_MAX_AGE = 7 * 24 * 3600.0
+FX_CATALOG_BUDGET = 0.002  # sec of EnumInstalledFX walking per defer tick
+FX_CATALOG_SOURCES = ("reaper-vstplugins", "reaper-clap-", "reaper-auplugins", "reaper-jsfx",
+                      "reaper-dxplugins", "reaper-lv2plugins")
+fx_catalog = None  # {"fx": [(name, ident, norm)], "index": {key: position}, "bare": {name: [positions]}}
+fx_catalog_job = None  # {"sig", "entries", "gen"} while EnumInstalledFX is walked
+FX_SUFFIX_RE = re.compile(r"\s*[\(\[][^\(\)\[\]]*[\)\]]\s*$")  # " (Cockos)", " [Telemetry]"
+
+def _fx_catalog_sig():
+    sig = []
+    try:
+        r = RPR_GetAppVersion()
+        sig.append(_as_str(r[0] if isinstance(r, tuple) else r))
+    except Exception:
+        pass
+    try:
+        r = RPR_GetResourcePath()
+        if isinstance(r, tuple): r = r[0]
+        root = str(r)
+        for fn in sorted(os.listdir(root)):
+            low = fn.lower()
+            if low.endswith(".ini") and low.startswith(FX_CATALOG_SOURCES):
+                st = os.stat(os.path.join(root, fn))
+                sig.append("%s:%d:%d" % (fn, st.st_size, int(st.st_mtime)))
+    except Exception:
+        pass
+    return "|".join(sig)
+
+def _enum_installed_fx_steps(out):
+    """Appends (name, ident) to out, one EnumInstalledFX call per step."""
+    if "RPR_EnumInstalledFX" not in globals():
+        return
+    i = 0
+    while True:
+        try:
+            ret = RPR_EnumInstalledFX(i, "", 512, "", 512)
+        except Exception:
+            return
+        if not isinstance(ret, tuple) or not ret[0]:
+            return
+        strs = [s for s in ret[1:] if isinstance(s, str)]
+        if strs:
+            out.append((strs[0], strs[1] if len(strs) > 1 else ""))
+        i += 1
+        yield
+
+def _bare_fx_name(norm):
+    """Normalized name without its vendor/format suffixes ("reaeq (cockos)" -> "reaeq")."""
+    while True:
+        bare = FX_SUFFIX_RE.sub("", norm)
+        if bare == norm:
+            return bare
+        norm = bare
+
+def _set_fx_catalog(entries):
+    global fx_catalog
+    fx = []
+    index = {}
+    bare = {}
+    for name, ident in entries:
+        norm = _norm_fx_name(name)
+        if not norm:
+            continue
+        index.setdefault(norm, len(fx))
+        bare.setdefault(_bare_fx_name(norm), []).append(len(fx))
+        # the file name ("RM_EQ2.jsfx", "reasyn.dll<1919...") also resolves
+        key = os.path.splitext(os.path.basename(ident.split("<")[0].replace("\\", "/")))[0].lower()
+        if key:
+            index.setdefault(key, len(fx))
+        fx.append((name, ident, norm))
+    fx_catalog = {"fx": fx, "index": index, "bare": bare}
+
+def load_fx_catalog(refresh=False):
+    """The catalog, read from disk when still valid, else an enumeration job
+    is started and the previous catalog (or None) is returned meanwhile."""
+    global fx_catalog_job
+    if fx_catalog is not None and not refresh:
+        return fx_catalog
+    if fx_catalog_job is not None:
+        return fx_catalog
+    sig = _fx_catalog_sig()
+    if not refresh:
+        try:
+            with open(FX_CATALOG_PATH, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+            if doc.get("sig") == sig and _now() - float(doc.get("ts", 0)) < FX_CATALOG_MAX_AGE:
+                _set_fx_catalog([(e[0], e[1]) for e in doc.get("fx", [])])
+                return fx_catalog
+        except Exception:
+            pass
+    entries = []
+    fx_catalog_job = {"sig": sig, "entries": entries, "gen": _enum_installed_fx_steps(entries)}
+    return fx_catalog
+
+def poll_fx_catalog():
+    """Advance a running catalog walk; installs and saves the catalog at the end."""
+    global fx_catalog_job
+    job = fx_catalog_job
+    if job is None:
+        return
+    t0 = _clock()
+    for _ in job["gen"]:
+        if _clock() - t0 >= FX_CATALOG_BUDGET:
+            return
+    fx_catalog_job = None
+    entries = job["entries"]
+    _set_fx_catalog(entries)
+    log("[RemoteMixer] FX catalog: %d installed FX" % len(entries))
+    if entries:
+        try:
+            with open(FX_CATALOG_PATH, "w", encoding="utf-8") as f:
+                json.dump({"sig": job["sig"], "ts": _now(), "fx": [list(e) for e in entries]}, f)
+        except Exception:
+            pass
+
+def resolve_fx_name(candidates):
+    """Installed FX name for the first candidate the catalog knows, or None.
+
+    A candidate matches a catalog name exactly, or the name without its
+    vendor/format suffix; a bare name shared by different plugins (two
+    vendors' "Compressor") is ambiguous and resolves to nothing.
+    """
+    cat = load_fx_catalog()
+    if not cat or not cat["fx"]:
+        return None
+    keys = [_norm_fx_name(c) for c in candidates]
+    for k in keys:
+        i = cat["index"].get(k)
+        if i is not None:
+            return cat["fx"][i][0]
+    for k in keys:
+        hits = cat["bare"].get(_bare_fx_name(k)) if k else None
+        if not hits:
+            continue
+        # the same plugin in several formats (VST/VST3) is still one plugin
+        if len(set(cat["fx"][i][2] for i in hits)) == 1:
+            return cat["fx"][hits[0]][0]
+    return None
+
+def search_fx_catalog(query, limit):
+    """Name prefix matches first, then matches at a word start."""
+    cat = load_fx_catalog()
+    if not cat:
+        return [], 0
+    q = _norm_fx_name(query)
+    first = []
+    rest = []
+    for name, ident, norm in cat["fx"]:
+        if not q or norm.startswith(q):
+            first.append({"name": name, "ident": ident})
+        elif (" " + q) in norm or ("_" + q) in norm or ("(" + q) in norm:
+            rest.append({"name": name, "ident": ident})
+    hits = first + rest
+    return hits[:limit], len(hits)
+
+# --- FX telemetry ---
+# RM_* JSFX publish read-only "Z Telemetry: <label>" sliders (peaks, GR dB)
+# from @block. Each FX instance is checked once (by FX GUID) during the
+# routing tier of a state pass; the matching params are then sampled at
+# meter cadence and sent as
+#   {"type":"telemetryLayout", "id", "fx": [{"guid", "fxIndex", "name", "labels", "params", "min", "max"}]}
+#   {"type":"telemetry", "id", "v": [[normalized value per param], ...per fx]}
+# min/max are the slider ranges (GR 0..24 dB, Atten 0..30, ...), read once at
+# detection; a value in units is min + v * (max - min).
+# The layout is re-sent when the set of sources changes; frames only when a
+# value moved or TELEMETRY_KEYFRAME_INTERVAL passed.
+telemetry_fx = {}  # fx guid -> (fx name, ((param, label, min, max), ...)); () = no telemetry
+telemetry_sources = []  # [(track guid, fxIndex, fx name, ((param, label, min, max), ...))]
+telemetry_layout_id = 0
+telemetry_layout_sent = False
+telemetry_last = None
+telemetry_last_sent = 0.0
+
+def _telemetry_params(track, fxIndex):
+    out = []
+    for p in range(_fx_param_count(track, fxIndex)):
+        try:
+            nm = _pick_human_string(RPR_TrackFX_GetParamName(track, fxIndex, p, "", 256), default="")
+        except Exception:
+            continue
+        i = nm.lower().find("telemetry:")
+        if i >= 0:
+            mn, mx = _fx_param_range(track, fxIndex, p)
+            if mn is None or mx is None:
+                mn, mx = 0.0, 1.0
+            out.append((p, nm[i + len("telemetry:"):].strip(), mn, mx))
+    return tuple(out)
+
+def find_telemetry_fx(track, fx_count, seen):
+    """[(fxIndex, fx name, params)] for the track's RM_* FX with telemetry sliders."""
+    out = []
+    for i in range(fx_count):
+        g = _fx_guid(track, i)
+        ent = telemetry_fx.get(g) if g else None
+        if ent is None:
+            name = _fx_name(track, i)
+            params = _telemetry_params(track, i) if _norm_fx_name(name).startswith("rm_") else ()
+            ent = (name, params)
+            if g:
+                telemetry_fx[g] = ent
+        if g:
+            seen.add(g)
+        if ent[1]:
+            out.append((i, ent[0], ent[1]))
+    return out
+
+def set_telemetry_sources(found, seen):
+    """found: {track guid: find_telemetry_fx() result} in track order."""
+    global telemetry_sources, telemetry_layout_id, telemetry_layout_sent
+    for g in [g for g in telemetry_fx if g not in seen]:
+        del telemetry_fx[g]
+    sources = []
+    for guid, fxs in found.items():
+        for fxIndex, name, params in fxs:
+            sources.append((guid, fxIndex, name, params))
+    if sources != telemetry_sources:
+        telemetry_sources = sources
+        telemetry_layout_id = (telemetry_layout_id + 1) & 0xFFFF
+        telemetry_layout_sent = False
+
+def reset_telemetry_stream():
+    global telemetry_layout_sent, telemetry_last
+    telemetry_layout_sent = False
+    telemetry_last = None
+
+def telemetry_msgs(now):
+    global telemetry_layout_sent, telemetry_last, telemetry_last_sent
+    if not telemetry_sources:
+        return []
+    msgs = []
+    if not telemetry_layout_sent:
+        telemetry_layout_sent = True
+        telemetry_last = None
+        msgs.append({"type":"telemetryLayout", "id": telemetry_layout_id,
+                     "fx": [{"guid": guid, "fxIndex": fxIndex, "name": name,
+                             "params": [e[0] for e in params], "labels": [e[1] for e in params],
+                             "min": [e[2] for e in params], "max": [e[3] for e in params]}
+                            for guid, fxIndex, name, params in telemetry_sources]})
+    tracks = {}
+    vals = []
+    for guid, fxIndex, name, params in telemetry_sources:
+        if guid not in tracks:
+            tracks[guid] = find_track_by_guid(guid)
+        tr = tracks[guid]
+        row = []
+        for p, _, _, _ in params:
+            try:
+                row.append(round(_fx_param_value(tr, fxIndex, p), 4) if tr else 0.0)
+            except Exception:
+                row.append(0.0)
+        vals.append(row)
+    if vals == telemetry_last and now - telemetry_last_sent < TELEMETRY_KEYFRAME_INTERVAL:
+        return msgs
+    telemetry_last = vals
+    telemetry_last_sent = now
+    msgs.append({"type":"telemetry", "id": telemetry_layout_id, "v": vals, "ts": now})
+    return msgs
 
 # --- FX helpers ---
 def get_fx_all_off(track):
@@ -866,68 +2570,136 @@ def fx_list(track):
         out.append({"index": i, "name": _fx_name(track,i), "enabled": _fx_enabled(track,i)})
     return out
 
-def fx_params(track, fxIndex):
-    params=[]
+# FX parameter metadata cache. Names and ranges don't change for an FX
+# instance, so they are read once per FX GUID; later fx_params() calls only
+# read the normalized values, and the raw value and formatted text only for
+# values that moved. Entries are checked against the parameter count on every use and
+# dropped when the track's chain is edited (invalidate_fx_meta).
+FX_META_MAX = 64  # cached FX instances
+fx_meta = {}  # fx guid -> {"track", "names", "min", "max", "vals", "raw", "fmt"}
+fx_meta_stats = {"hits": 0, "misses": 0}
+
+def _fx_guid(track, fxIndex):
+    try:
+        if "RPR_TrackFX_GetFXGUID" not in globals():
+            return ""
+        g = _guid_to_string(RPR_TrackFX_GetFXGUID(track, fxIndex))
+        return g if g.startswith("{") else ""
+    except Exception:
+        return ""
+
+def invalidate_fx_meta(track=None):
+    """Forget cached FX metadata for one track (None: everything)."""
+    if track is None:
+        fx_meta.clear()
+        return
+    tg = track_guid(track)
+    for g in [g for g, e in fx_meta.items() if e["track"] == tg]:
+        del fx_meta[g]
+
+def _fx_param_count(track, fxIndex):
     try:
         pc = RPR_TrackFX_GetNumParams(track, fxIndex)
         if isinstance(pc, tuple): pc=pc[0]
-        pc = int(pc)
+        return int(pc)
     except Exception:
-        pc = 0
-    for p in range(pc):
-        try:
-            nm = _pick_human_string(RPR_TrackFX_GetParamName(track, fxIndex, p, "", 256), default="Param %d" % (p+1))
-            val = RPR_TrackFX_GetParamNormalized(track, fxIndex, p)
-            if isinstance(val, tuple): val=val[0]
-            # formatted value (human-friendly text like "-12.0 dB" / "3.5 ms")
-            fmt = ""
-            try:
-                fmt = _pick_human_string(RPR_TrackFX_GetFormattedParamValue(track, fxIndex, p, "", 256), default="")
-            except Exception:
-                fmt = ""
+        return 0
 
-            raw = None
-            mn = None
-            mx = None
-            try:
-                rv = RPR_TrackFX_GetParam(track, fxIndex, p)
-                if isinstance(rv, tuple): rv = rv[0]
-                raw = float(rv)
-            except Exception:
-                raw = None
-            try:
-                ex = RPR_TrackFX_GetParamEx(track, fxIndex, p, 0.0, 0.0)
-                # typically returns (retval, minval, maxval)
-                if isinstance(ex, tuple) and len(ex) >= 3:
-                    mn = float(ex[1])
-                    mx = float(ex[2])
-            except Exception:
-                mn = None
-                mx = None
+def _fx_param_value(track, fxIndex, p):
+    val = RPR_TrackFX_GetParamNormalized(track, fxIndex, p)
+    if isinstance(val, tuple): val=val[0]
+    return float(val)
 
-            params.append({"index": p, "name": nm, "value": float(val), "fmt": fmt, "raw": raw, "min": mn, "max": mx})
-        except Exception:
-            pass
-    return params
+def _fx_param_fmt(track, fxIndex, p):
+    # formatted value (human-friendly text like "-12.0 dB" / "3.5 ms")
+    try:
+        return _pick_human_string(RPR_TrackFX_GetFormattedParamValue(track, fxIndex, p, "", 256), default="")
+    except Exception:
+        return ""
 
-def add_fx_by_name(track, name):
-    # add by name; returns index or -1
+def _fx_param_raw(track, fxIndex, p):
     try:
-        # instantiate flag:
-        #  -1 = query only (do not add)
-        #   1 = add/instantiate
-        idx = RPR_TrackFX_AddByName(track, name, False, 1)
-        if isinstance(idx, tuple): idx=idx[0]
-        return int(idx)
+        rv = RPR_TrackFX_GetParam(track, fxIndex, p)
+        if isinstance(rv, tuple): rv = rv[0]
+        return float(rv)
     except Exception:
-        return -1
+        return None
 
-def _norm_fx_name(s):
-    """Normalize FX names so we can match catalog names to existing FX for duplication."""
+def _fx_param_range(track, fxIndex, p):
     try:
-        s = str(s or "").strip()
+        ex = RPR_TrackFX_GetParamEx(track, fxIndex, p, 0.0, 0.0, 0.0)
+        # (retval, track, fx, param, minval, maxval, midval)
+        if isinstance(ex, tuple) and len(ex) >= 6:
+            return float(ex[4]), float(ex[5])
     except Exception:
-        return ""
+        pass
+    return None, None
+
+def _read_fx_meta(track, fxIndex, pc):
+    e = {"track": track_guid(track), "names": [], "min": [], "max": [], "vals": [], "raw": [], "fmt": []}
+    for p in range(pc):
+        e["names"].append(_pick_human_string(RPR_TrackFX_GetParamName(track, fxIndex, p, "", 256), default="Param %d" % (p+1)))
+        mn, mx = _fx_param_range(track, fxIndex, p)
+        e["min"].append(mn)
+        e["max"].append(mx)
+        e["vals"].append(None)
+        e["raw"].append(None)
+        e["fmt"].append("")
+    return e
+
+def fx_params(track, fxIndex):
+    pc = _fx_param_count(track, fxIndex)
+    g = _fx_guid(track, fxIndex)
+    e = fx_meta.pop(g, None) if g else None
+    if e is not None and len(e["names"]) != pc:
+        e = None
+    if e is None:
+        fx_meta_stats["misses"] += 1
+        try:
+            e = _read_fx_meta(track, fxIndex, pc)
+        except Exception:
+            e = None
+    else:
+        fx_meta_stats["hits"] += 1
+    if e is None:
+        return []
+    if g:
+        # most recently used last; evict from the front
+        fx_meta[g] = e
+        while len(fx_meta) > FX_META_MAX:
+            del fx_meta[next(iter(fx_meta))]
+    params=[]
+    for p in range(pc):
+        try:
+            val = _fx_param_value(track, fxIndex, p)
+            if val != e["vals"][p]:
+                e["fmt"][p] = _fx_param_fmt(track, fxIndex, p)
+                e["raw"][p] = _fx_param_raw(track, fxIndex, p)
+                e["vals"][p] = val
+            params.append({"index": p, "name": e["names"][p], "value": val, "fmt": e["fmt"][p],
+                           "raw": e["raw"][p], "min": e["min"][p], "max": e["max"][p]})
+        except Exception:
+            pass
+    return params
+
+def add_fx_by_name(track, name):
+    # add by name; returns index or -1
+    try:
+        # instantiate flag:
+        #  -1 = query only (do not add)
+        #   1 = add/instantiate
+        idx = RPR_TrackFX_AddByName(track, name, False, 1)
+        if isinstance(idx, tuple): idx=idx[0]
+        return int(idx)
+    except Exception:
+        return -1
+
+def _norm_fx_name(s):
+    """Normalize FX names so we can match catalog names to existing FX for duplication."""
+    try:
+        s = str(s or "").strip()
+    except Exception:
+        return ""
     sl = s.lower()
     for pref in ("jsfx:","js:","vst3:","vst:","au:","clap:","dx:"):
         if sl.startswith(pref):
@@ -952,533 +2724,1139 @@ def move_fx(track, frm, to):
     except Exception:
         return False
 
+# --- FX parameter subscriptions ---
+# subscribeFxParams answers with a full fxParams message, then the FX is
+# polled every 1/rate sec and only moved values are pushed:
+#   {"type":"fxParamDelta", "guid", "fxIndex", "p": [[index, value, fmt, raw], ...]}
+# If another FX now sits at the subscribed index (or its parameter count
+# changed) a fresh full fxParams is sent instead. Polling shares
+# FX_SUB_BUDGET per tick; subscriptions that didn't fit stay due.
+fx_subs = {}  # (track guid, fxIndex) -> {"guid", "fxIndex", "fx", "interval", "next", "vals"}
+fx_sub_stats = {"polls": 0, "deltas": 0, "resends": 0, "rejected": 0}
+
+def clear_fx_subs():
+    fx_subs.clear()
+
+def _fx_sub_baseline(sock, sub, tr):
+    params = fx_params(tr, sub["fxIndex"])
+    sub["fx"] = _fx_guid(tr, sub["fxIndex"])
+    sub["vals"] = [p["value"] for p in params]
+    _send(sock, {"type":"fxParams","guid":sub["guid"],"fxIndex":sub["fxIndex"],"params":params})
+
+def subscribe_fx_params(sock, guid, fxIndex, tr, rate):
+    key = (guid, fxIndex)
+    sub = fx_subs.get(key)
+    if sub is None and len(fx_subs) >= FX_SUB_MAX:
+        fx_sub_stats["rejected"] += 1
+        _send(sock, {"type":"fxParamsSubscribed","guid":guid,"fxIndex":fxIndex,"ok":False,
+                     "error":"too many subscriptions (max %d)" % FX_SUB_MAX})
+        return
+    rate = max(FX_SUB_RATE_MIN, min(FX_SUB_RATE_MAX, rate))
+    if sub is None:
+        sub = fx_subs[key] = {"guid": guid, "fxIndex": fxIndex, "fx": "", "vals": []}
+    sub["interval"] = 1.0 / rate
+    sub["next"] = _now() + sub["interval"]
+    _send(sock, {"type":"fxParamsSubscribed","guid":guid,"fxIndex":fxIndex,"ok":True,"rate":rate})
+    _fx_sub_baseline(sock, sub, tr)
+
+def unsubscribe_fx_params(guid, fxIndex):
+    fx_subs.pop((guid, fxIndex), None)
+
+def _poll_fx_sub(sock, sub):
+    tr = find_track_by_guid(sub["guid"])
+    if not tr:
+        # track is gone; the client learns that from the state stream
+        unsubscribe_fx_params(sub["guid"], sub["fxIndex"])
+        return
+    fxIndex = sub["fxIndex"]
+    vals = sub["vals"]
+    if _fx_param_count(tr, fxIndex) != len(vals) or _fx_guid(tr, fxIndex) != sub["fx"]:
+        fx_sub_stats["resends"] += 1
+        _fx_sub_baseline(sock, sub, tr)
+        return
+    out = []
+    for p in range(len(vals)):
+        try:
+            val = _fx_param_value(tr, fxIndex, p)
+        except Exception:
+            continue
+        if val != vals[p]:
+            vals[p] = val
+            out.append([p, val, _fx_param_fmt(tr, fxIndex, p), _fx_param_raw(tr, fxIndex, p)])
+    if out:
+        fx_sub_stats["deltas"] += 1
+        _send(sock, {"type":"fxParamDelta","guid":sub["guid"],"fxIndex":fxIndex,"p":out})
+
+def poll_fx_subs(sock, now):
+    if not fx_subs:
+        return
+    t0 = _clock()
+    # most overdue first, so a tight budget still gets round to everyone
+    for sub in sorted(fx_subs.values(), key=lambda s: s["next"]):
+        if sub["next"] > now:
+            break
+        sub["next"] = max(sub["next"] + sub["interval"], now)
+        fx_sub_stats["polls"] += 1
+        try:
+            _poll_fx_sub(sock, sub)
+        except Exception:
+            pass
+        if _clock() - t0 >= FX_SUB_BUDGET:
+            break
+
+def fx_sub_stats_msg():
+    out = dict(fx_sub_stats)
+    out["active"] = len(fx_subs)
+    return out
+
+# --- spectrum subscriptions ---
+# RM_EQ2/RM_EQ4 publish their analyzer as "-Z Spec NN" sliders (0..1, log
+# frequency bins). subscribeSpectrum finds those params once per FX instance
+# and then reads only them, every 1/rate sec, pushing
+#   {"type":"spectrum", "guid", "fxIndex", "n", "data": base64 of one byte per bin}
+# when the quantized frame changed. Bins are ordered by their NN number.
+spec_subs = {}  # (track guid, fxIndex) -> {"guid", "fxIndex", "kind", "fx", "bins", "interval", "next", "last"}
+spec_sub_stats = {"polls": 0, "frames": 0, "rejected": 0}
+
+def clear_spectrum_subs():
+    spec_subs.clear()
+
+def _spectrum_bins(track, fxIndex):
+    bins = []
+    for p in range(_fx_param_count(track, fxIndex)):
+        try:
+            nm = _pick_human_string(RPR_TrackFX_GetParamName(track, fxIndex, p, "", 256), default="")
+        except Exception:
+            continue
+        m = SPECTRUM_BIN_RE.search(nm)
+        if m:
+            bins.append((int(m.group(1)), p))
+    bins.sort()
+    return [p for _, p in bins]
+
+def subscribe_spectrum(sock, guid, fxIndex, tr, rate):
+    key = (guid, fxIndex)
+    sub = spec_subs.get(key)
+    if sub is None and len(spec_subs) >= SPECTRUM_SUB_MAX:
+        spec_sub_stats["rejected"] += 1
+        _send(sock, {"type":"spectrumSubscribed","guid":guid,"fxIndex":fxIndex,"ok":False,
+                     "error":"too many subscriptions (max %d)" % SPECTRUM_SUB_MAX})
+        return
+    bins = _spectrum_bins(tr, fxIndex)
+    if not bins:
+        _send(sock, {"type":"spectrumSubscribed","guid":guid,"fxIndex":fxIndex,"ok":False,
+                     "error":"no spectrum bins"})
+        return
+    rate = max(SPECTRUM_RATE_MIN, min(SPECTRUM_RATE_MAX, rate))
+    if sub is None:
+        # own tx kind, so a queued frame only replaces this EQ's older frame
+        sub = spec_subs[key] = {"guid": guid, "fxIndex": fxIndex, "kind": "spectrum:%s:%d" % (guid, fxIndex)}
+    sub.update({"fx": _fx_guid(tr, fxIndex), "bins": bins, "interval": 1.0 / rate,
+                "next": _now(), "last": None})
+    _send(sock, {"type":"spectrumSubscribed","guid":guid,"fxIndex":fxIndex,"ok":True,
+                 "rate":rate,"bins":len(bins)})
+
+def unsubscribe_spectrum(guid, fxIndex):
+    sub = spec_subs.pop((guid, fxIndex), None)
+    if sub is not None:
+        _drop_tx(sub["kind"])
+
+def _poll_spectrum(sock, sub):
+    tr = find_track_by_guid(sub["guid"])
+    fxIndex = sub["fxIndex"]
+    if not tr or _fx_guid(tr, fxIndex) != sub["fx"]:
+        # the EQ went away or moved; the subscriber has to ask again
+        unsubscribe_spectrum(sub["guid"], fxIndex)
+        _send(sock, {"type":"spectrumSubscribed","guid":sub["guid"],"fxIndex":fxIndex,"ok":False,
+                     "error":"fx changed"})
+        return
+    q = bytearray(len(sub["bins"]))
+    for i, p in enumerate(sub["bins"]):
+        try:
+            q[i] = _q8(_fx_param_value(tr, fxIndex, p))
+        except Exception:
+            pass
+    q = bytes(q)
+    if q == sub["last"]:
+        return
+    sub["last"] = q
+    spec_sub_stats["frames"] += 1
+    _send(sock, {"type":"spectrum","guid":sub["guid"],"fxIndex":fxIndex,"n":len(q),
+                 "data":base64.b64encode(q).decode("ascii")}, sub["kind"], replace=True)
+
+def poll_spectrum_subs(sock, now):
+    if not spec_subs:
+        return
+    t0 = _clock()
+    for sub in sorted(spec_subs.values(), key=lambda s: s["next"]):
+        if sub["next"] > now:
+            break
+        sub["next"] = max(sub["next"] + sub["interval"], now)
+        spec_sub_stats["polls"] += 1
+        try:
+            _poll_spectrum(sock, sub)
+        except Exception:
+            pass
+        if _clock() - t0 >= FX_SUB_BUDGET:
+            break
+
+def spectrum_stats():
+    out = dict(spec_sub_stats)
+    out["active"] = len(spec_subs)
+    return out
+
+# --- stats ---
+def build_stats():
+    return {"type":"stats",
+            "scan": state_scan_stats(),
+            "meter": meter_rate_stats(),
+            "commands": cmd_queue_stats(),
+            "send": tx_queue_stats(),
+            "handlers": cmd_timing_stats(),
+            "fxSubs": fx_sub_stats_msg(),
+            "spectrum": spectrum_stats(),
+            "fxMeta": {"entries": len(fx_meta), "hits": fx_meta_stats["hits"], "misses": fx_meta_stats["misses"]},
+            "profile": profile_stats(),
+            "ts": _now(),
+            "version": VERSION}
+
 # --- command handling ---
-def handle_cmd(cmd, sock):
-    typ = cmd.get("type","")
+# Structural edits refresh the track list through _refresh_tracklist(); inside
+# a batch the refresh is deferred and done once when the batch ends.
+BATCH_MAX = 256  # sub-commands per batch
+ui_batch_depth = 0
+ui_refresh_pending = False
+
+def _refresh_tracklist():
+    global ui_refresh_pending
+    if ui_batch_depth > 0:
+        ui_refresh_pending = True
+        return
+    RPR_TrackList_AdjustWindows(False)
+    RPR_UpdateArrange()
+
+def run_batch(cmd, sock):
+    """Run cmd["cmds"] as one undo step with a single UI refresh; returns batchResult.
+
+    Each result is {"type"} plus "error" when the sub-command was not run
+    (invalid, unknown, track not found) or raised. Handlers swallow REAPER
+    failures themselves, so a result without an error only says it was run.
+    """
+    global ui_batch_depth, ui_refresh_pending
+    subs = cmd.get("cmds")
+    if not isinstance(subs, list):
+        subs = []
+    out = {"type":"batchResult", "id": cmd.get("id"), "results": []}
+    if len(subs) > BATCH_MAX:
+        out["error"] = "too many commands (max %d)" % BATCH_MAX
+        return out
+    results = out["results"]
+    ui_batch_depth += 1
+    if ui_batch_depth == 1:
+        ui_refresh_pending = False
+        try: RPR_PreventUIRefresh(1)
+        except Exception: pass
+        try: RPR_Undo_BeginBlock2(0)
+        except Exception: pass
     try:
-        if typ == "reqState":
-            _send(sock, build_state()); return
-        if typ == "transport":
-            action = cmd.get("action", "")
-            if action == "play":
-                try: RPR_OnPlayButton()
-                except Exception: pass
-            elif action == "stop":
-                try: RPR_OnStopButton()
-                except Exception: pass
-            elif action == "pause":
-                try: RPR_OnPauseButton()
-                except Exception: pass
-            elif action == "record":
-                try: RPR_OnRecordButton()
+        for sub in subs:
+            typ = sub.get("type", "") if isinstance(sub, dict) else ""
+            res = {"type": typ}
+            results.append(res)
+            if not typ or typ == "batch":
+                res["error"] = "invalid command"
+                continue
+            ent = COMMANDS.get(typ)
+            if ent is None:
+                res["error"] = "unknown command"
+                continue
+            if ent[1] == TRACK_REQUIRED and find_track_by_guid(sub.get("guid", "")) is None:
+                res["error"] = "track not found"
+                continue
+            if not handle_cmd(sub, sock):
+                res["error"] = "failed"
+            mark_cmd_dirty(typ)
+    finally:
+        ui_batch_depth -= 1
+        if ui_batch_depth == 0:
+            try: RPR_Undo_EndBlock2(0, "RemoteMixer: %d changes" % len(subs), -1)
+            except Exception: pass
+            try: RPR_PreventUIRefresh(-1)
+            except Exception: pass
+            if ui_refresh_pending:
+                ui_refresh_pending = False
+                try: _refresh_tracklist()
                 except Exception: pass
-            return
-        if typ == "setBpm":
-            bpm = int(round(float(cmd.get("bpm", 120.0))))
-            bpm = max(20, min(300, bpm))
-            try:
-                if "RPR_SetCurrentBPM" in globals():
-                    RPR_SetCurrentBPM(0, bpm, True)
-                elif "RPR_SetTempoTimeSigMarker" in globals():
-                    RPR_SetTempoTimeSigMarker(0, -1, 0, -1, -1, bpm, 0, 0, False)
-            except Exception:
-                pass
-            return
-        if typ == "setVol":
-            guid = cmd.get("guid","")
-            vol = float(cmd.get("vol", 1.0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "D_VOL", vol)
-            return
-        if typ == "setPan":
-            guid = cmd.get("guid","")
-            pan = float(cmd.get("pan", 0.0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "D_PAN", pan)
-            return
-        if typ == "setMute":
-            guid = cmd.get("guid","")
-            mute = bool(cmd.get("mute", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "B_MUTE", 1.0 if mute else 0.0)
-            return
-        if typ == "setSolo":
-            guid = cmd.get("guid","")
-            solo = bool(cmd.get("solo", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "I_SOLO", 2.0 if solo else 0.0)
-            return
-        if typ == "setRec":
-            guid = cmd.get("guid","")
-            rec = bool(cmd.get("rec", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "I_RECARM", 1.0 if rec else 0.0)
-            return
-        if typ == "addTrack":
-            try:
-                cnt = RPR_CountTracks(0)
-                if isinstance(cnt, tuple): cnt = cnt[0]
-                RPR_InsertTrackAtIndex(int(cnt), True)
-                RPR_TrackList_AdjustWindows(False)
-                RPR_UpdateArrange()
-            except Exception:
-                pass
-            return
-        if typ == "addSpacer":
+    return out
+
+# --- command handlers ---
+# One function per command type, called as fn(sock, a). COMMANDS maps the
+# type to (handler, track, args): args is a schema of (name, conv, default)
+# parsed once by handle_cmd (conv None = passed through as is), and track says
+# how cmd["guid"] is resolved into a["tr"]: TRACK_REQUIRED skips the handler
+# when the track isn't found, TRACK_OPTIONAL passes None.
+TRACK_REQUIRED = "track"
+TRACK_OPTIONAL = "track?"
+
+def _cmd_batch(sock, a):
+    _send(sock, run_batch(a, sock))
+
+def _cmd_req_state(sock, a):
+    # next state tick sends a full snapshot of the last finished pass
+    reset_state_stream()
+
+def _cmd_req_stats(sock, a):
+    stats = build_stats()
+    stats["id"] = a["id"]
+    _send(sock, stats)
+
+def _cmd_set_profile(sock, a):
+    global PROFILE_ENABLED
+    if a["enabled"] is not None:
+        PROFILE_ENABLED = bool(a["enabled"])
+    if a["apiCalls"] is not None:
+        set_api_counting(bool(a["apiCalls"]))
+    reset_profile_window()
+    stats = build_stats()
+    stats["id"] = a["id"]
+    _send(sock, stats)
+
+def _cmd_set_api_trace(sock, a):
+    set_api_tracing(a["enabled"])
+    report = api_trace_report(a["top"])
+    report["id"] = a["id"]
+    _send(sock, report)
+
+def _cmd_req_api_trace(sock, a):
+    report = api_trace_report(a["top"])
+    report["id"] = a["id"]
+    _send(sock, report)
+    if a["log"]:
+        log_api_trace()
+    if a["reset"]:
+        reset_api_trace()
+
+def _cmd_set_capture(sock, a):
+    if a["enabled"]:
+        start_capture()
+    else:
+        stop_capture()
+    status = capture_status()
+    status["id"] = a["id"]
+    _send(sock, status)
+
+def _cmd_req_log(sock, a):
+    _send(sock, {"type":"log", "id": a["id"], "lines": recent_log(a["lines"], a["level"] or None)})
+
+def _cmd_set_meter_format(sock, a):
+    set_meter_format(a["format"])
+
+def _cmd_set_meter_source(sock, a):
+    src = set_meter_source(a["source"])
+    _send(sock, {"type":"meterSource","source":src})
+
+def _cmd_install_meter_fx(sock, a):
+    # add RM_Meter collectors (one track by guid, or every track + master)
+    if a["guid"]:
+        targets = [a["tr"]]
+    else:
+        m = RPR_GetMasterTrack(0)
+        if isinstance(m, tuple): m = m[0]
+        targets = [m]
+        for i in range(_count_tracks()):
+            tr = RPR_GetTrack(0, i)
+            if isinstance(tr, tuple): tr = tr[0]
+            targets.append(tr)
+    for tr in targets:
+        if tr:
+            install_meter_fx(tr)
+
+def _cmd_transport(sock, a):
+    action = a["action"]
+    if action == "play":
+        try: RPR_OnPlayButton()
+        except Exception: pass
+    elif action == "stop":
+        try: RPR_OnStopButton()
+        except Exception: pass
+    elif action == "pause":
+        try: RPR_OnPauseButton()
+        except Exception: pass
+    elif action == "record":
+        try: RPR_OnRecordButton()
+        except Exception: pass
+
+def _cmd_set_bpm(sock, a):
+    bpm = int(round(a["bpm"]))
+    bpm = max(20, min(300, bpm))
+    try:
+        if "RPR_SetCurrentBPM" in globals():
+            RPR_SetCurrentBPM(0, bpm, True)
+        elif "RPR_SetTempoTimeSigMarker" in globals():
+            RPR_SetTempoTimeSigMarker(0, -1, 0, -1, -1, bpm, 0, 0, False)
+    except Exception:
+        pass
+
+def _cmd_set_vol(sock, a):
+    RPR_SetMediaTrackInfo_Value(a["tr"], "D_VOL", a["vol"])
+
+def _cmd_set_pan(sock, a):
+    RPR_SetMediaTrackInfo_Value(a["tr"], "D_PAN", a["pan"])
+
+def _cmd_set_mute(sock, a):
+    RPR_SetMediaTrackInfo_Value(a["tr"], "B_MUTE", 1.0 if a["mute"] else 0.0)
+
+def _cmd_set_solo(sock, a):
+    RPR_SetMediaTrackInfo_Value(a["tr"], "I_SOLO", 2.0 if a["solo"] else 0.0)
+
+def _cmd_set_rec(sock, a):
+    RPR_SetMediaTrackInfo_Value(a["tr"], "I_RECARM", 1.0 if a["rec"] else 0.0)
+
+def _cmd_add_track(sock, a):
+    try:
+        cnt = RPR_CountTracks(0)
+        if isinstance(cnt, tuple): cnt = cnt[0]
+        RPR_InsertTrackAtIndex(int(cnt), True)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_add_spacer(sock, a):
+    try:
+        tr = a["tr"]
+        if not tr:
+            cnt = RPR_CountTracks(0)
+            if isinstance(cnt, tuple): cnt = cnt[0]
+            idx = max(0, int(cnt) - 1)
+            tr = RPR_GetTrack(0, idx) if cnt else None
+            if isinstance(tr, tuple): tr = tr[0]
+        if tr:
             try:
-                guid = cmd.get("guid", "")
-                tr = find_track_by_guid(guid) if guid else None
-                if not tr:
-                    cnt = RPR_CountTracks(0)
-                    if isinstance(cnt, tuple): cnt = cnt[0]
-                    idx = max(0, int(cnt) - 1)
-                    tr = RPR_GetTrack(0, idx) if cnt else None
-                    if isinstance(tr, tuple): tr = tr[0]
-                if tr:
-                    try:
-                        RPR_SetMediaTrackInfo_Value(tr, "I_SPACER", 1.0)
-                    except Exception:
-                        pass
-                RPR_TrackList_AdjustWindows(False)
-                RPR_UpdateArrange()
+                RPR_SetMediaTrackInfo_Value(tr, "I_SPACER", 1.0)
             except Exception:
                 pass
-            return
-        if typ == "setSpacer":
-            guid = cmd.get("guid", "")
-            enabled = bool(cmd.get("enabled", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try:
-                    RPR_SetMediaTrackInfo_Value(tr, "I_SPACER", 1.0 if enabled else 0.0)
-                    RPR_TrackList_AdjustWindows(False)
-                    RPR_UpdateArrange()
-                except Exception:
-                    pass
-            return
-        if typ == "deleteTrack":
-            guid = cmd.get("guid", "")
-            tr = find_track_by_guid(guid)
-            if tr:
-                try:
-                    RPR_DeleteTrack(tr)
-                    RPR_TrackList_AdjustWindows(False)
-                    RPR_UpdateArrange()
-                except Exception:
-                    pass
-            return
-        if typ == "moveTrack":
-            guid = cmd.get("guid","")
-            before_guid = cmd.get("beforeGuid", None)
-            to_index = cmd.get("toIndex", None)
-            tr = find_track_by_guid(guid)
-            if tr:
-                src_idx = _track_index(tr)
-                dest_idx = None
-                if before_guid:
-                    tr_before = find_track_by_guid(before_guid)
-                    if tr_before:
-                        dest_idx = _track_index(tr_before)
-                if dest_idx is None and to_index is not None:
-                    try: dest_idx = int(to_index)
-                    except Exception: dest_idx = None
-                if dest_idx is None:
-                    return
-                if dest_idx > src_idx and before_guid:
-                    dest_idx -= 1
-                try:
-                    RPR_SetOnlyTrackSelected(tr)
-                    RPR_ReorderSelectedTracks(dest_idx, 0)
-                    RPR_TrackList_AdjustWindows(False)
-                    RPR_UpdateArrange()
-                except Exception:
-                    pass
-            return
-        if typ == "setTrackColor":
-            guid = cmd.get("guid","")
-            color = _color_from_hex(cmd.get("color",""))
-            tr = find_track_by_guid(guid)
-            if tr and color is not None:
-                try:
-                    RPR_SetTrackColor(tr, color)
-                except Exception:
-                    pass
-            return
-        if typ == "createFolderWithTrack":
-            guid = cmd.get("guid","")
-            tr = find_track_by_guid(guid)
-            if tr:
-                idx = _track_index(tr)
-                try:
-                    RPR_InsertTrackAtIndex(idx, True)
-                    folder_tr = RPR_GetTrack(0, idx)
-                    if isinstance(folder_tr, tuple): folder_tr = folder_tr[0]
-                    if folder_tr:
-                        RPR_GetSetMediaTrackInfo_String(folder_tr, "P_NAME", "Folder", True)
-                        RPR_SetMediaTrackInfo_Value(folder_tr, "I_FOLDERDEPTH", 1.0)
-                    tr = find_track_by_guid(guid)
-                    if tr:
-                        depth = RPR_GetMediaTrackInfo_Value(tr, "I_FOLDERDEPTH")
-                        if isinstance(depth, tuple): depth = depth[0]
-                        if int(depth) == 0:
-                            RPR_SetMediaTrackInfo_Value(tr, "I_FOLDERDEPTH", -1.0)
-                    RPR_TrackList_AdjustWindows(False)
-                    RPR_UpdateArrange()
-                except Exception:
-                    pass
-            return
-        if typ == "moveTrackToFolder":
-            guid = cmd.get("guid","")
-            folder_guid = cmd.get("folderGuid","")
-            tr = find_track_by_guid(guid)
-            folder_tr = find_track_by_guid(folder_guid)
-            if tr and folder_tr:
-                dest_idx = _track_index(folder_tr) + 1
-                src_idx = _track_index(tr)
-                if dest_idx > src_idx:
-                    dest_idx -= 1
-                try:
-                    RPR_SetOnlyTrackSelected(tr)
-                    RPR_ReorderSelectedTracks(dest_idx, 0)
-                    RPR_TrackList_AdjustWindows(False)
-                    RPR_UpdateArrange()
-                except Exception:
-                    pass
-            return
-        if typ == "renameTrack":
-            guid = cmd.get("guid","")
-            name = _as_str(cmd.get("name",""))
-            tr = find_track_by_guid(guid)
-            if tr and name:
-                try:
-                    RPR_GetSetMediaTrackInfo_String(tr, "P_NAME", name, True)
-                except Exception:
-                    pass
-            return
-        if typ == "setSendVol":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            vol = float(cmd.get("vol", 1.0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, 0, idx, "D_VOL", vol)
-                except Exception: pass
-            return
-        if typ == "setSendMute":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            mute = bool(cmd.get("mute", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, 0, idx, "B_MUTE", 1.0 if mute else 0.0)
-                except Exception: pass
-            return
-        if typ == "setSendMode":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            # 2-state UI: 0=post, 1=pre (use REAPER pre-fx mode = 1)
-            mode = int(cmd.get("mode", 0))
-            mode = 1 if mode else 0
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, 0, idx, "I_SENDMODE", mode)
-                except Exception: pass
-            return
-        if typ == "setSendSrcChan":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            chan = int(cmd.get("chan", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, 0, idx, "I_SRCCHAN", chan)
-                except Exception: pass
-            return
-        if typ == "setSendDstChan":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            chan = int(cmd.get("chan", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, 0, idx, "I_DSTCHAN", chan)
-                except Exception: pass
-            return
-        if typ == "addSend":
-            guid = cmd.get("guid","")
-            dest_guid = cmd.get("destGuid","")
-            src_chan = cmd.get("srcChan", None)
-            dst_chan = cmd.get("dstChan", None)
-            tr = find_track_by_guid(guid)
-            dest = find_track_by_guid(dest_guid)
-            if tr and dest:
-                try:
-                    idx = RPR_CreateTrackSend(tr, dest)
-                    if isinstance(idx, tuple): idx = idx[0]
-                    if idx is not None and (src_chan is not None or dst_chan is not None):
-                        if src_chan is not None:
-                            try: RPR_SetTrackSendInfo_Value(tr, 0, int(idx), "I_SRCCHAN", int(src_chan))
-                            except Exception: pass
-                        if dst_chan is not None:
-                            try: RPR_SetTrackSendInfo_Value(tr, 0, int(idx), "I_DSTCHAN", int(dst_chan))
-                            except Exception: pass
-                except Exception: pass
-            return
-        if typ == "setRecvVol":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            vol = float(cmd.get("vol", 1.0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, -1, idx, "D_VOL", vol)
-                except Exception: pass
-            return
-        if typ == "setRecvMute":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            mute = bool(cmd.get("mute", False))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, -1, idx, "B_MUTE", 1.0 if mute else 0.0)
-                except Exception: pass
-            return
-        if typ == "setRecvSrcChan":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            chan = int(cmd.get("chan", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, -1, idx, "I_SRCCHAN", chan)
-                except Exception: pass
-            return
-        if typ == "setRecvDstChan":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            chan = int(cmd.get("chan", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                try: RPR_SetTrackSendInfo_Value(tr, -1, idx, "I_DSTCHAN", chan)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_set_spacer(sock, a):
+    try:
+        RPR_SetMediaTrackInfo_Value(a["tr"], "I_SPACER", 1.0 if a["enabled"] else 0.0)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_delete_track(sock, a):
+    try:
+        RPR_DeleteTrack(a["tr"])
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_move_track(sock, a):
+    tr = a["tr"]
+    before_guid = a["beforeGuid"]
+    to_index = a["toIndex"]
+    src_idx = _track_index(tr)
+    dest_idx = None
+    if before_guid:
+        tr_before = find_track_by_guid(before_guid)
+        if tr_before:
+            dest_idx = _track_index(tr_before)
+    if dest_idx is None and to_index is not None:
+        try: dest_idx = int(to_index)
+        except Exception: dest_idx = None
+    if dest_idx is None:
+        return
+    if dest_idx > src_idx and before_guid:
+        dest_idx -= 1
+    try:
+        RPR_SetOnlyTrackSelected(tr)
+        RPR_ReorderSelectedTracks(dest_idx, 0)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_set_track_color(sock, a):
+    color = _color_from_hex(a["color"])
+    if color is not None:
+        try:
+            RPR_SetTrackColor(a["tr"], color)
+        except Exception:
+            pass
+
+def _cmd_create_folder_with_track(sock, a):
+    guid = a["guid"]
+    idx = _track_index(a["tr"])
+    try:
+        RPR_InsertTrackAtIndex(idx, True)
+        folder_tr = RPR_GetTrack(0, idx)
+        if isinstance(folder_tr, tuple): folder_tr = folder_tr[0]
+        if folder_tr:
+            RPR_GetSetMediaTrackInfo_String(folder_tr, "P_NAME", "Folder", True)
+            RPR_SetMediaTrackInfo_Value(folder_tr, "I_FOLDERDEPTH", 1.0)
+        tr = find_track_by_guid(guid)
+        if tr:
+            depth = RPR_GetMediaTrackInfo_Value(tr, "I_FOLDERDEPTH")
+            if isinstance(depth, tuple): depth = depth[0]
+            if int(depth) == 0:
+                RPR_SetMediaTrackInfo_Value(tr, "I_FOLDERDEPTH", -1.0)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_move_track_to_folder(sock, a):
+    tr = a["tr"]
+    folder_tr = find_track_by_guid(a["folderGuid"])
+    if not folder_tr:
+        return
+    dest_idx = _track_index(folder_tr) + 1
+    src_idx = _track_index(tr)
+    if dest_idx > src_idx:
+        dest_idx -= 1
+    try:
+        RPR_SetOnlyTrackSelected(tr)
+        RPR_ReorderSelectedTracks(dest_idx, 0)
+        _refresh_tracklist()
+    except Exception:
+        pass
+
+def _cmd_rename_track(sock, a):
+    if a["name"]:
+        try:
+            RPR_GetSetMediaTrackInfo_String(a["tr"], "P_NAME", a["name"], True)
+        except Exception:
+            pass
+
+def _set_link(a, cat, key, value):
+    try: RPR_SetTrackSendInfo_Value(a["tr"], cat, a["index"], key, value)
+    except Exception: pass
+
+def _cmd_set_send_vol(sock, a):
+    _set_link(a, 0, "D_VOL", a["vol"])
+
+def _cmd_set_send_mute(sock, a):
+    _set_link(a, 0, "B_MUTE", 1.0 if a["mute"] else 0.0)
+
+def _cmd_set_send_mode(sock, a):
+    # 2-state UI: 0=post, 1=pre (use REAPER pre-fx mode = 1)
+    _set_link(a, 0, "I_SENDMODE", 1 if a["mode"] else 0)
+
+def _cmd_set_send_src_chan(sock, a):
+    _set_link(a, 0, "I_SRCCHAN", a["chan"])
+
+def _cmd_set_send_dst_chan(sock, a):
+    _set_link(a, 0, "I_DSTCHAN", a["chan"])
+
+def _cmd_set_recv_vol(sock, a):
+    _set_link(a, -1, "D_VOL", a["vol"])
+
+def _cmd_set_recv_mute(sock, a):
+    _set_link(a, -1, "B_MUTE", 1.0 if a["mute"] else 0.0)
+
+def _cmd_set_recv_src_chan(sock, a):
+    _set_link(a, -1, "I_SRCCHAN", a["chan"])
+
+def _cmd_set_recv_dst_chan(sock, a):
+    _set_link(a, -1, "I_DSTCHAN", a["chan"])
+
+def _create_send(src, dest, src_chan, dst_chan):
+    try:
+        idx = RPR_CreateTrackSend(src, dest)
+        if isinstance(idx, tuple): idx = idx[0]
+        if idx is not None and (src_chan is not None or dst_chan is not None):
+            if src_chan is not None:
+                try: RPR_SetTrackSendInfo_Value(src, 0, int(idx), "I_SRCCHAN", int(src_chan))
                 except Exception: pass
-            return
-        if typ == "addReturn":
-            guid = cmd.get("guid","")
-            source_guid = cmd.get("sourceGuid","")
-            src_chan = cmd.get("srcChan", None)
-            dst_chan = cmd.get("dstChan", None)
-            tr = find_track_by_guid(guid)
-            source = find_track_by_guid(source_guid)
-            if tr and source:
-                try:
-                    idx = RPR_CreateTrackSend(source, tr)
-                    if isinstance(idx, tuple): idx = idx[0]
-                    if idx is not None and (src_chan is not None or dst_chan is not None):
-                        if src_chan is not None:
-                            try: RPR_SetTrackSendInfo_Value(source, 0, int(idx), "I_SRCCHAN", int(src_chan))
-                            except Exception: pass
-                        if dst_chan is not None:
-                            try: RPR_SetTrackSendInfo_Value(source, 0, int(idx), "I_DSTCHAN", int(dst_chan))
-                            except Exception: pass
+            if dst_chan is not None:
+                try: RPR_SetTrackSendInfo_Value(src, 0, int(idx), "I_DSTCHAN", int(dst_chan))
                 except Exception: pass
-            return
-        if typ == "setRecInput":
-
-            guid = cmd.get("guid","")
-            # UI sends 1..16 for mono hw input
-            inp = int(cmd.get("input", 1))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_SetMediaTrackInfo_Value(tr, "I_RECINPUT", max(0, inp-1))
-            return
-        if typ == "showFxChain":
-            guid = cmd.get("guid","")
-            tr = find_track_by_guid(guid)
-            if tr:
-                # Show track FX chain (command 40291)
-                RPR_TrackFX_Show(tr, 0, 1)  # show chain if possible
-            return
-        if typ == "reqFxList":
-            guid = cmd.get("guid","")
-            tr = find_track_by_guid(guid)
-            if tr:
-                _send(sock, {"type":"fxList","guid":guid,"fx":fx_list(tr)})
-            else:
-                _send(sock, {"type":"fxList","guid":guid,"fx":[]})
-            return
-        if typ == "setFxEnabled":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            enabled = bool(cmd.get("enabled", True))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_TrackFX_SetEnabled(tr, idx, enabled)
-            return
-        if typ == "setFxAllEnabled":
-            guid = cmd.get("guid","")
-            enabled = bool(cmd.get("enabled", True))
-            tr = find_track_by_guid(guid)
-            if tr:
-                cnt = get_fx_count(tr)
-                for i in range(cnt):
-                    try: RPR_TrackFX_SetEnabled(tr, i, enabled)
-                    except Exception: pass
-            return
+    except Exception: pass
+
+def _cmd_add_send(sock, a):
+    dest = find_track_by_guid(a["destGuid"])
+    if dest:
+        _create_send(a["tr"], dest, a["srcChan"], a["dstChan"])
+
+def _cmd_add_return(sock, a):
+    source = find_track_by_guid(a["sourceGuid"])
+    if source:
+        _create_send(source, a["tr"], a["srcChan"], a["dstChan"])
 
-        if typ == "deleteFx":
-            guid = cmd.get("guid","")
-            idx = int(cmd.get("index", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
+def _cmd_set_rec_input(sock, a):
+    # UI sends 1..16 for mono hw input
+    RPR_SetMediaTrackInfo_Value(a["tr"], "I_RECINPUT", max(0, a["input"]-1))
+
+def _cmd_show_fx_chain(sock, a):
+    # Show track FX chain (command 40291)
+    RPR_TrackFX_Show(a["tr"], 0, 1)  # show chain if possible
+
+def _cmd_req_fx_list(sock, a):
+    fx = fx_list(a["tr"]) if a["tr"] else []
+    _send(sock, {"type":"fxList","guid":a["guid"],"fx":fx})
+
+def _cmd_set_fx_enabled(sock, a):
+    RPR_TrackFX_SetEnabled(a["tr"], a["index"], a["enabled"])
+
+def _cmd_set_fx_all_enabled(sock, a):
+    tr = a["tr"]
+    cnt = get_fx_count(tr)
+    for i in range(cnt):
+        try: RPR_TrackFX_SetEnabled(tr, i, a["enabled"])
+        except Exception: pass
+
+def _cmd_delete_fx(sock, a):
+    invalidate_fx_meta(a["tr"])
+    try:
+        RPR_TrackFX_Delete(a["tr"], a["index"])
+    except Exception:
+        pass
+
+def _cmd_move_fx(sock, a):
+    invalidate_fx_meta(a["tr"])
+    move_fx(a["tr"], a["from"], a["to"])
+
+def _cmd_req_fx_params(sock, a):
+    params = fx_params(a["tr"], a["fxIndex"]) if a["tr"] else []
+    _send(sock, {"type":"fxParams","guid":a["guid"],"fxIndex":a["fxIndex"],"params":params})
+
+def _cmd_subscribe_fx_params(sock, a):
+    subscribe_fx_params(sock, a["guid"], a["fxIndex"], a["tr"], a["rate"])
+
+def _cmd_unsubscribe_fx_params(sock, a):
+    unsubscribe_fx_params(a["guid"], a["fxIndex"])
+
+def _cmd_subscribe_spectrum(sock, a):
+    subscribe_spectrum(sock, a["guid"], a["fxIndex"], a["tr"], a["rate"])
+
+def _cmd_unsubscribe_spectrum(sock, a):
+    unsubscribe_spectrum(a["guid"], a["fxIndex"])
+
+def _cmd_search_fx_catalog(sock, a):
+    limit = max(1, min(200, a["limit"]))
+    if a["refresh"]:
+        load_fx_catalog(refresh=True)
+    hits, total = search_fx_catalog(a["query"], limit)
+    _send(sock, {"type":"fxCatalog","id":a["id"],"query":a["query"],"results":hits,"total":total,
+                 "pending": fx_catalog_job is not None})
+
+def _cmd_set_fx_param(sock, a):
+    RPR_TrackFX_SetParamNormalized(a["tr"], a["fxIndex"], a["param"], a["value"])
+
+def _cmd_add_fx(sock, a):
+    tr = a["tr"]
+    name = a["name"]
+    if not name:
+        return
+    invalidate_fx_meta(tr)
+    # Support fallback names separated by "||"
+    candidates = [s.strip() for s in name.split("||") if str(s).strip()]
+    # try the installed name the catalog resolves to first
+    try:
+        resolved = resolve_fx_name(candidates)
+    except Exception:
+        resolved = None
+    if resolved:
+        candidates = [resolved] + [c for c in candidates if c != resolved]
+    try:
+        before = RPR_TrackFX_GetCount(tr)
+        if isinstance(before, tuple): before = before[0]
+        before = int(before)
+    except Exception:
+        before = -1
+
+    def _try_duplicate_by_name(candName, beforeCount):
+        """Fallback: if AddByName doesn't increase FX count (some ReaScript setups),
+        duplicate the first matching existing FX by copying it to the end."""
+        try:
+            cn = _norm_fx_name(candName)
+            if not cn:
+                return False
+            existing = fx_list(tr)
+            for fx in existing:
                 try:
-                    RPR_TrackFX_Delete(tr, idx)
+                    nm = _norm_fx_name(fx.get("name",""))
+                    if cn in nm or nm in cn:
+                        return copy_fx(tr, int(fx.get("index",0)), int(beforeCount))
                 except Exception:
-                    pass
-            return
+                    continue
+        except Exception:
+            pass
+        return False
 
-        if typ == "moveFx":
-            guid = cmd.get("guid","")
-            frm = int(cmd.get("from", 0))
-            to = int(cmd.get("to", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                move_fx(tr, frm, to)
-            return
-        if typ == "reqFxParams":
-            guid = cmd.get("guid","")
-            fxIndex = int(cmd.get("fxIndex", 0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                _send(sock, {"type":"fxParams","guid":guid,"fxIndex":fxIndex,"params":fx_params(tr, fxIndex)})
-            else:
-                _send(sock, {"type":"fxParams","guid":guid,"fxIndex":fxIndex,"params":[]})
-            return
-        if typ == "setFxParam":
-            guid = cmd.get("guid","")
-            fxIndex = int(cmd.get("fxIndex", 0))
-            param = int(cmd.get("param", 0))
-            value = float(cmd.get("value", 0.0))
-            tr = find_track_by_guid(guid)
-            if tr:
-                RPR_TrackFX_SetParamNormalized(tr, fxIndex, param, value)
-            return
-        if typ == "addFx":
-            guid = cmd.get("guid","")
-            name = _as_str(cmd.get("name",""))
-            tr = find_track_by_guid(guid)
-            if tr and name:
-                # Support fallback names separated by "||"
-                candidates = [s.strip() for s in name.split("||") if str(s).strip()]
+    for cand in candidates:
+        try:
+            add_fx_by_name(tr, cand)
+        except Exception:
+            pass
+        try:
+            after = RPR_TrackFX_GetCount(tr)
+            if isinstance(after, tuple): after = after[0]
+            after = int(after)
+        except Exception:
+            after = before
+
+        # Success if FX count increased
+        if before >= 0 and after > before:
+            break
+
+        # If it didn't increase, try duplicating an existing matching FX
+        if before >= 0:
+            if _try_duplicate_by_name(cand, before):
                 try:
-                    before = RPR_TrackFX_GetCount(tr)
-                    if isinstance(before, tuple): before = before[0]
-                    before = int(before)
+                    after2 = RPR_TrackFX_GetCount(tr)
+                    if isinstance(after2, tuple): after2 = after2[0]
+                    after2 = int(after2)
                 except Exception:
-                    before = -1
-
-                def _try_duplicate_by_name(candName, beforeCount):
-                    """Fallback: if AddByName doesn't increase FX count (some ReaScript setups),
-                    duplicate the first matching existing FX by copying it to the end."""
-                    try:
-                        cn = _norm_fx_name(candName)
-                        if not cn:
-                            return False
-                        existing = fx_list(tr)
-                        for fx in existing:
-                            try:
-                                nm = _norm_fx_name(fx.get("name",""))
-                                if cn in nm or nm in cn:
-                                    return copy_fx(tr, int(fx.get("index",0)), int(beforeCount))
-                            except Exception:
-                                continue
-                    except Exception:
-                        pass
-                    return False
-
-                for cand in candidates:
-                    try:
-                        add_fx_by_name(tr, cand)
-                    except Exception:
-                        pass
-                    try:
-                        after = RPR_TrackFX_GetCount(tr)
-                        if isinstance(after, tuple): after = after[0]
-                        after = int(after)
-                    except Exception:
-                        after = before
-
-                    # Success if FX count increased
-                    if before >= 0 and after > before:
-                        break
+                    after2 = before
+                if after2 > before:
+                    break
+
+    _send(sock, {"type":"fxList","guid":a["guid"],"fx":fx_list(tr)})
+
+_LINK = (("index", int, 0),)
+_NEW_LINK = (("srcChan", None, None), ("dstChan", None, None))
+
+COMMANDS = {
+    # type: (handler, track lookup, args)
+    "batch": (_cmd_batch, None, (("cmds", None, None), ("id", None, None))),
+    "reqState": (_cmd_req_state, None, ()),
+    "reqStats": (_cmd_req_stats, None, (("id", None, None),)),
+    "setProfile": (_cmd_set_profile, None, (("enabled", None, None), ("apiCalls", None, None),
+                                            ("id", None, None))),
+    "reqLog": (_cmd_req_log, None, (("lines", int, 200), ("level", _as_str, ""), ("id", None, None))),
+    "setCapture": (_cmd_set_capture, None, (("enabled", bool, True), ("id", None, None))),
+    "setApiTrace": (_cmd_set_api_trace, None, (("enabled", bool, True), ("top", int, API_TRACE_TOP),
+                                              ("id", None, None))),
+    "reqApiTrace": (_cmd_req_api_trace, None, (("top", int, API_TRACE_TOP), ("reset", bool, False),
+                                              ("log", bool, False), ("id", None, None))),
+    "setMeterFormat": (_cmd_set_meter_format, None, (("format", _as_str, ""),)),
+    "setMeterSource": (_cmd_set_meter_source, None, (("source", _as_str, ""),)),
+    "installMeterFx": (_cmd_install_meter_fx, TRACK_OPTIONAL, ()),
+    "transport": (_cmd_transport, None, (("action", _as_str, ""),)),
+    "setBpm": (_cmd_set_bpm, None, (("bpm", float, 120.0),)),
+    "setVol": (_cmd_set_vol, TRACK_REQUIRED, (("vol", float, 1.0),)),
+    "setPan": (_cmd_set_pan, TRACK_REQUIRED, (("pan", float, 0.0),)),
+    "setMute": (_cmd_set_mute, TRACK_REQUIRED, (("mute", bool, False),)),
+    "setSolo": (_cmd_set_solo, TRACK_REQUIRED, (("solo", bool, False),)),
+    "setRec": (_cmd_set_rec, TRACK_REQUIRED, (("rec", bool, False),)),
+    "addTrack": (_cmd_add_track, None, ()),
+    "addSpacer": (_cmd_add_spacer, TRACK_OPTIONAL, ()),
+    "setSpacer": (_cmd_set_spacer, TRACK_REQUIRED, (("enabled", bool, False),)),
+    "deleteTrack": (_cmd_delete_track, TRACK_REQUIRED, ()),
+    "moveTrack": (_cmd_move_track, TRACK_REQUIRED, (("beforeGuid", None, None), ("toIndex", None, None))),
+    "setTrackColor": (_cmd_set_track_color, TRACK_REQUIRED, (("color", None, ""),)),
+    "createFolderWithTrack": (_cmd_create_folder_with_track, TRACK_REQUIRED, ()),
+    "moveTrackToFolder": (_cmd_move_track_to_folder, TRACK_REQUIRED, (("folderGuid", None, ""),)),
+    "renameTrack": (_cmd_rename_track, TRACK_REQUIRED, (("name", _as_str, ""),)),
+    "setSendVol": (_cmd_set_send_vol, TRACK_REQUIRED, _LINK + (("vol", float, 1.0),)),
+    "setSendMute": (_cmd_set_send_mute, TRACK_REQUIRED, _LINK + (("mute", bool, False),)),
+    "setSendMode": (_cmd_set_send_mode, TRACK_REQUIRED, _LINK + (("mode", int, 0),)),
+    "setSendSrcChan": (_cmd_set_send_src_chan, TRACK_REQUIRED, _LINK + (("chan", int, 0),)),
+    "setSendDstChan": (_cmd_set_send_dst_chan, TRACK_REQUIRED, _LINK + (("chan", int, 0),)),
+    "addSend": (_cmd_add_send, TRACK_REQUIRED, (("destGuid", None, ""),) + _NEW_LINK),
+    "setRecvVol": (_cmd_set_recv_vol, TRACK_REQUIRED, _LINK + (("vol", float, 1.0),)),
+    "setRecvMute": (_cmd_set_recv_mute, TRACK_REQUIRED, _LINK + (("mute", bool, False),)),
+    "setRecvSrcChan": (_cmd_set_recv_src_chan, TRACK_REQUIRED, _LINK + (("chan", int, 0),)),
+    "setRecvDstChan": (_cmd_set_recv_dst_chan, TRACK_REQUIRED, _LINK + (("chan", int, 0),)),
+    "addReturn": (_cmd_add_return, TRACK_REQUIRED, (("sourceGuid", None, ""),) + _NEW_LINK),
+    "setRecInput": (_cmd_set_rec_input, TRACK_REQUIRED, (("input", int, 1),)),
+    "showFxChain": (_cmd_show_fx_chain, TRACK_REQUIRED, ()),
+    "reqFxList": (_cmd_req_fx_list, TRACK_OPTIONAL, ()),
+    "setFxEnabled": (_cmd_set_fx_enabled, TRACK_REQUIRED, (("index", int, 0), ("enabled", bool, True))),
+    "setFxAllEnabled": (_cmd_set_fx_all_enabled, TRACK_REQUIRED, (("enabled", bool, True),)),
+    "deleteFx": (_cmd_delete_fx, TRACK_REQUIRED, (("index", int, 0),)),
+    "moveFx": (_cmd_move_fx, TRACK_REQUIRED, (("from", int, 0), ("to", int, 0))),
+    "reqFxParams": (_cmd_req_fx_params, TRACK_OPTIONAL, (("fxIndex", int, 0),)),
+    "subscribeFxParams": (_cmd_subscribe_fx_params, TRACK_REQUIRED, (("fxIndex", int, 0), ("rate", float, FX_SUB_RATE))),
+    "unsubscribeFxParams": (_cmd_unsubscribe_fx_params, TRACK_OPTIONAL, (("fxIndex", int, 0),)),
+    "subscribeSpectrum": (_cmd_subscribe_spectrum, TRACK_REQUIRED, (("fxIndex", int, 0), ("rate", float, SPECTRUM_RATE))),
+    "unsubscribeSpectrum": (_cmd_unsubscribe_spectrum, TRACK_OPTIONAL, (("fxIndex", int, 0),)),
+    "searchFxCatalog": (_cmd_search_fx_catalog, None, (("query", _as_str, ""), ("limit", int, 50),
+                                                       ("refresh", bool, False), ("id", None, None))),
+    "setFxParam": (_cmd_set_fx_param, TRACK_REQUIRED, (("fxIndex", int, 0), ("param", int, 0), ("value", float, 0.0))),
+    "addFx": (_cmd_add_fx, TRACK_REQUIRED, (("name", _as_str, ""),)),
+}
+
+# per command type: [calls, errors, total sec, max sec]
+cmd_timing = {}
 
-                    # If it didn't increase, try duplicating an existing matching FX
-                    if before >= 0:
-                        if _try_duplicate_by_name(cand, before):
-                            try:
-                                after2 = RPR_TrackFX_GetCount(tr)
-                                if isinstance(after2, tuple): after2 = after2[0]
-                                after2 = int(after2)
-                            except Exception:
-                                after2 = before
-                            if after2 > before:
-                                break
-
-                _send(sock, {"type":"fxList","guid":guid,"fx":fx_list(tr)})
-            return
-    except Exception:
-        log("handle_cmd error", typ, traceback.format_exc())
+def handle_cmd(cmd, sock):
+    """Apply one command; returns False if it failed or isn't known."""
+    typ = cmd.get("type","")
+    ent = COMMANDS.get(typ)
+    if ent is None:
+        return False
+    fn, track, spec = ent
+    t0 = _clock()
+    ok = True
+    try:
+        a = {}
+        for name, conv, default in spec:
+            v = cmd.get(name, default)
+            a[name] = v if conv is None else conv(v)
+        if track is not None:
+            guid = cmd.get("guid", "")
+            a["guid"] = guid
+            a["tr"] = find_track_by_guid(guid) if guid else None
+        if track != TRACK_REQUIRED or a["tr"]:
+            fn(sock, a)
+    except Exception:
+        log_error("handle_cmd error", typ, traceback.format_exc())
+        ok = False
+    dt = _clock() - t0
+    st = cmd_timing.get(typ)
+    if st is None:
+        st = cmd_timing[typ] = [0, 0, 0.0, 0.0]
+    st[0] += 1
+    if not ok:
+        st[1] += 1
+    st[2] += dt
+    if dt > st[3]:
+        st[3] = dt
+    return ok
+
+def cmd_timing_stats():
+    out = {}
+    for typ, (n, err, total, mx) in cmd_timing.items():
+        out[typ] = {"count": n, "errors": err,
+                    "totalMs": round(total * 1000.0, 3),
+                    "maxMs": round(mx * 1000.0, 3)}
+    return out
 
-# --- track lookup ---
-def find_track_by_guid(guid):
-    # Special stable master guid
+# --- command queue ---
+# Lines from _recv_lines are parsed on arrival and queued with their receive
+# time; drain_commands() runs them in order until CMD_BUDGET or
+# CMD_MAX_PER_TICK is used up, leaving the rest for the next tick.
+#
+# Continuous "set" commands (fader/pan/send/param drags) are coalesced while
+# queued: a newer command for the same target cancels the queued one and
+# takes its place at the back. Any other command is a barrier, so sets never
+# move across structural commands like moveTrack or deleteTrack.
+CMD_COALESCE = {
+    "setBpm": (),
+    "setVol": ("guid",),
+    "setPan": ("guid",),
+    "setMute": ("guid",),
+    "setSolo": ("guid",),
+    "setRec": ("guid",),
+    "setRecInput": ("guid",),
+    "setTrackColor": ("guid",),
+    "setSendVol": ("guid", "index"),
+    "setSendMute": ("guid", "index"),
+    "setSendMode": ("guid", "index"),
+    "setSendSrcChan": ("guid", "index"),
+    "setSendDstChan": ("guid", "index"),
+    "setRecvVol": ("guid", "index"),
+    "setRecvMute": ("guid", "index"),
+    "setRecvSrcChan": ("guid", "index"),
+    "setRecvDstChan": ("guid", "index"),
+    "setFxEnabled": ("guid", "index"),
+    "setFxParam": ("guid", "fxIndex", "param"),
+}
+cmd_queue = deque()  # [received clock, cmd dict or None once coalesced away, key]
+cmd_latest = {}  # coalesce key -> queued entry, since the last barrier
+cmd_dead = 0  # coalesced-away entries still in cmd_queue
+cmd_stats = {"received": 0, "handled": 0, "malformed": 0, "coalesced": 0,
+             "maxDepth": 0, "lastDrained": 0, "budgetHits": 0,
+             "latencyMs": 0.0, "maxLatencyMs": 0.0}
+
+def _coalesce_key(cmd):
+    typ = cmd.get("type", "")
+    fields = CMD_COALESCE.get(typ)
+    if fields is None:
+        return None
     try:
-        if guid == "MASTER" or guid == "{MASTER}":
-            m = RPR_GetMasterTrack(0)
-            if isinstance(m, tuple): m = m[0]
-            return m
+        return (typ,) + tuple(_as_str(cmd.get(f, "")) for f in fields)
     except Exception:
-        pass
+        return None
 
-    # Compare using stable GUID strings
+def enqueue_commands(lines):
+    global cmd_dead
+    t = _clock()
+    for ln in lines:
+        if not ln.strip() or ln == "__EOF__":
+            continue
+        if capture_path is not None:
+            capture_in(ln)
+        try:
+            cmd = json.loads(ln)
+        except Exception:
+            cmd = None
+        if not isinstance(cmd, dict):
+            cmd_stats["malformed"] += 1
+            continue
+        cmd_stats["received"] += 1
+        key = _coalesce_key(cmd)
+        if key is None:
+            cmd_latest.clear()
+        else:
+            prev = cmd_latest.get(key)
+            if prev is not None:
+                prev[1] = None
+                cmd_dead += 1
+                cmd_stats["coalesced"] += 1
+        ent = [t, cmd, key]
+        cmd_queue.append(ent)
+        if key is not None:
+            cmd_latest[key] = ent
+    depth = len(cmd_queue) - cmd_dead
+    if depth > cmd_stats["maxDepth"]:
+        cmd_stats["maxDepth"] = depth
+
+def drain_commands(sock):
+    """Run queued commands within this tick's budget; returns how many ran."""
+    global cmd_dead
+    t0 = _clock()
+    n = 0
+    while cmd_queue and n < CMD_MAX_PER_TICK:
+        t_in, cmd, key = cmd_queue.popleft()
+        if cmd is None:
+            cmd_dead -= 1
+            continue
+        if key is not None and cmd_latest.get(key) is not None and cmd_latest[key][1] is cmd:
+            del cmd_latest[key]
+        try:
+            handle_cmd(cmd, sock)
+            mark_cmd_dirty(cmd.get("type", ""))
+        except Exception:
+            pass
+        n += 1
+        t = _clock()
+        lat = (t - t_in) * 1000.0
+        # smoothed latency from receive to completion
+        cmd_stats["latencyMs"] += (lat - cmd_stats["latencyMs"]) * 0.1
+        if lat > cmd_stats["maxLatencyMs"]:
+            cmd_stats["maxLatencyMs"] = lat
+        if t - t0 >= CMD_BUDGET:
+            break
+    if len(cmd_queue) > cmd_dead:
+        cmd_stats["budgetHits"] += 1
+    cmd_stats["handled"] += n
+    cmd_stats["lastDrained"] = n
+    return n
+
+def clear_commands():
+    global rx_buf, cmd_dead
+    cmd_queue.clear()
+    cmd_latest.clear()
+    cmd_dead = 0
+    rx_buf = b""
+
+def cmd_queue_stats():
+    out = dict(cmd_stats)
+    out["depth"] = len(cmd_queue) - cmd_dead
+    oldest = 0.0
+    for ent in cmd_queue:
+        if ent[1] is not None:
+            oldest = (_clock() - ent[0]) * 1000.0
+            break
+    out["oldestMs"] = oldest
+    return out
+
+# --- traffic capture ---
+# Optional journal of the TCP traffic for offline replay (Scripts/rm_replay.py).
+# One JSON array per line, times in ms since the capture started:
+#   ["h", 1, version, wall clock, [[track guid, fx count], ...]]  header/layout
+#   ["c", ms]                   connected to the server
+#   ["i", ms, line]             inbound command line, as received
+#   ["o", ms, type, bytes]      outbound message (size only)
+# Lines are buffered and appended every CAPTURE_FLUSH_INTERVAL; the capture
+# stops by itself once the file reaches CAPTURE_MAX_BYTES.
+capture_path = None
+capture_t0 = 0.0
+capture_buf = []
+capture_buf_bytes = 0
+capture_bytes = 0
+capture_events = 0
+capture_flushed = 0.0
+
+def _capture_layout():
+    out = []
+    for i in range(_count_tracks()):
+        try:
+            tr = RPR_GetTrack(0, i)
+            if isinstance(tr, tuple): tr = tr[0]
+            out.append([_track_guid_str(tr), get_fx_count(tr)])
+        except Exception:
+            pass
+    return out
+
+def _capture(rec):
+    global capture_buf_bytes, capture_events
+    ln = _safe_json(rec) + "\n"
+    capture_buf.append(ln)
+    capture_buf_bytes += len(ln)
+    capture_events += 1
+
+def _capture_ms():
+    return round((_clock() - capture_t0) * 1000.0, 1)
+
+def start_capture():
+    global capture_path, capture_t0, capture_bytes, capture_events, capture_buf_bytes, capture_flushed
+    if capture_path is not None:
+        return capture_path
+    name = "RemoteMixer.capture-%s.jsonl" % time.strftime("%Y%m%d-%H%M%S")
+    capture_path = os.path.join(os.path.dirname(LOG_PATH), name)
+    capture_t0 = _clock()
+    capture_flushed = _now()
+    del capture_buf[:]
+    capture_buf_bytes = capture_bytes = capture_events = 0
+    _capture(["h", 1, VERSION, _now(), _capture_layout()])
+    if sock is not None:
+        _capture(["c", 0.0])
+    log("[RemoteMixer] capturing traffic to %s" % capture_path)
+    return capture_path
+
+def stop_capture():
+    global capture_path
+    if capture_path is None:
+        return
+    flush_capture()
+    log("[RemoteMixer] capture stopped: %d events, %d bytes" % (capture_events, capture_bytes))
+    capture_path = None
+
+def capture_in(line):
+    if capture_path is not None:
+        _capture(["i", _capture_ms(), line])
+
+def capture_out(obj, nbytes):
+    if capture_path is not None:
+        _capture(["o", _capture_ms(), obj.get("type", "?") if isinstance(obj, dict) else "?", nbytes])
+
+def capture_connected():
+    if capture_path is not None:
+        _capture(["c", _capture_ms()])
+
+def flush_capture():
+    global capture_buf_bytes, capture_bytes, capture_flushed
+    capture_flushed = _now()
+    if not capture_buf:
+        return
+    data = "".join(capture_buf)
+    del capture_buf[:]
+    capture_buf_bytes = 0
     try:
-        m = RPR_GetMasterTrack(0)
-        if track_guid(m) == guid:
-            return m
+        with open(capture_path, "a", encoding="utf-8", errors="replace") as f:
+            f.write(data)
+        capture_bytes += len(data)
     except Exception:
-        pass
+        log_error("[RemoteMixer] capture write failed", traceback.format_exc())
+        stop_capture()
+
+def poll_capture(now):
+    if capture_path is None:
+        return
+    if now - capture_flushed >= CAPTURE_FLUSH_INTERVAL or capture_buf_bytes >= CAPTURE_MAX_BUFFER:
+        flush_capture()
+        if capture_path is not None and capture_bytes >= CAPTURE_MAX_BYTES:
+            log_warn("[RemoteMixer] capture reached %d bytes" % CAPTURE_MAX_BYTES)
+            stop_capture()
+
+def capture_status():
+    return {"type":"captureStatus", "enabled": capture_path is not None, "path": capture_path or "",
+            "events": capture_events, "bytes": capture_bytes + capture_buf_bytes}
+
+# --- track lookup ---
+# GUID string -> MediaTrack handle. Filled by every build_state() scan; a miss
+# only triggers a rescan when the track count / project change count moved
+# since the index was built. Hits are validated before use.
+guid_index = {}
+guid_index_sig = None
+
+def _count_tracks():
     try:
         n = RPR_CountTracks(0)
         if isinstance(n, tuple): n=n[0]
-        n=int(n)
+        return int(n)
     except Exception:
-        n=0
+        return 0
+
+def _track_guid_str(track):
+    """GUID string for a non-master track (skips the master check in track_guid)."""
+    try:
+        return _guid_to_string(RPR_GetTrackGUID(track))
+    except Exception:
+        return _as_str(track)
+
+def _valid_track(track):
+    try:
+        if "RPR_ValidatePtr2" in globals():
+            ok = RPR_ValidatePtr2(0, track, "MediaTrack*")
+            if isinstance(ok, tuple): ok = ok[0]
+            return bool(ok)
+        return True
+    except Exception:
+        return False
+
+def set_guid_index(index, n):
+    global guid_index, guid_index_sig
+    guid_index = index
+    guid_index_sig = (n, project_change_sig())
+
+def rebuild_guid_index():
+    n = _count_tracks()
+    index = {}
     for i in range(n):
         tr = RPR_GetTrack(0,i)
         if isinstance(tr, tuple): tr=tr[0]
         if not tr: continue
-        if track_guid(tr) == guid:
+        index[_track_guid_str(tr)] = tr
+    set_guid_index(index, n)
+
+def find_track_by_guid(guid):
+    # Special stable master guid
+    try:
+        if guid == "MASTER" or guid == "{MASTER}":
+            m = RPR_GetMasterTrack(0)
+            if isinstance(m, tuple): m = m[0]
+            return m
+    except Exception:
+        pass
+    if not guid:
+        return None
+
+    tr = guid_index.get(guid)
+    if tr is not None:
+        if _valid_track(tr) and _track_guid_str(tr) == guid:
             return tr
-    return None
+    elif guid_index_sig is not None and guid_index_sig == (_count_tracks(), project_change_sig()):
+        # index is current; the guid just isn't in the project
+        return None
+
+    rebuild_guid_index()
+    return guid_index.get(guid)
 
 # --- TCP loop ---
 sock = None
-rx_buf = []
 last_state_sent = 0.0
+last_keyframe_sent = 0.0
 last_meter_sent = 0.0
+meter_interval = METER_INTERVAL
 next_connect = 0.0
+last_stats_sent = 0.0
 
 def connect():
-    global sock, next_connect
+    global sock, next_connect, last_stats_sent
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         s.settimeout(1.5)
         s.connect((HOST, PORT))
         s.settimeout(0.0)
         sock = s
+        clear_commands()
+        clear_fx_subs()
+        clear_spectrum_subs()
+        reset_telemetry_stream()
+        reset_tx()
+        reset_state_stream()
+        reset_profile_window()
+        last_stats_sent = _now()
+        set_meter_format("json")  # until the server asks for something else
+        capture_connected()
         log("[RemoteMixer v%s] TCP connected -> %s:%d" % (VERSION, HOST, PORT))
         # hello (server may log)
-        _send(sock, {"type":"hello","version":VERSION,"ts":_now()})
+        _send(sock, {"type":"hello","version":VERSION,"ts":_now(),"meterFormats":list(METER_FORMATS)})
         return True
     except Exception:
         sock = None
@@ -1486,13 +3864,16 @@ def connect():
         return False
 
 def loop():
-    global sock, rx_buf, last_state_sent, last_meter_sent, next_connect
+    global sock, last_state_sent, last_keyframe_sent, last_meter_sent, meter_interval, next_connect
+    global last_stats_sent
     now = _now()
+    pt = prof_tick_begin()
 
     # connect
     if sock is None:
         if now >= next_connect:
             connect()
+        flush_log()
         # defer
         try:
             RPR_defer("loop()")
@@ -1504,41 +3885,111 @@ def loop():
     # read commands
     try:
         lines = _recv_lines(sock)
+        enqueue_commands(lines)
+        pt = prof_phase("recv", pt)
         if "__EOF__" in lines:
+            # the peer closed after sending: still run what it sent
+            while cmd_queue and drain_commands(sock):
+                pass
             try: sock.close()
             except Exception: pass
             sock = None
+            clear_commands()
         else:
-            for ln in lines:
-                if not ln.strip(): continue
-                try:
-                    cmd = json.loads(ln)
-                    handle_cmd(cmd, sock)
-                except Exception:
-                    # ignore malformed lines
-                    pass
+            drain_commands(sock)
     except Exception:
         try: sock.close()
         except Exception: pass
         sock = None
+        clear_commands()
+    pt = prof_phase("commands", pt)
 
-    # periodic state
+    # state: the running scan advances every tick, publishing is paced
+    try:
+        advance_state(now)
+    except Exception:
+        pass
     try:
         if now - last_state_sent >= STATE_INTERVAL:
-            st = build_state()
-            _send(sock, st)
+            st = poll_state(now)
+            # while a state message is still unwritten, hold off: the next
+            # delta is taken against the last queued one and covers both
+            if st is not None and not tx_pending("state"):
+                if now - last_keyframe_sent >= STATE_KEYFRAME_INTERVAL:
+                    reset_state_stream()
+                if state_base is None:
+                    last_keyframe_sent = now
+                msg = state_delta_msg(st)
+                if msg is not None and not _send(sock, msg, "state"):
+                    reset_state_stream()
             last_state_sent = now
     except Exception:
         pass
+    pt = prof_phase("state", pt)
 
     # periodic meter
     try:
-        if now - last_meter_sent >= METER_INTERVAL:
-            mt = build_meter()
-            _send(sock, mt)
+        if now - last_meter_sent >= meter_interval:
+            # backlog: drop the queued frames; this tick's frame is then the
+            # keyframe _drop_tx() forces, superseding them
+            _drop_tx("meter")
+            msgs, peak = meter_msgs(now)
+            for mt in msgs:
+                if mt.get("type") == "meterLayout":
+                    ok = _send(sock, mt)
+                else:
+                    ok = _send(sock, mt, "meter")
+                if not ok:
+                    set_meter_format(meter_format)  # re-send the layout + keyframe
+                    break
+            for mt in telemetry_msgs(now):
+                if mt.get("type") == "telemetryLayout":
+                    ok = _send(sock, mt)
+                else:
+                    ok = _send(sock, mt, "telemetry", replace=True)
+                if not ok:
+                    reset_telemetry_stream()
+                    break
             last_meter_sent = now
+            meter_interval = update_meter_rate(now, peak)
+    except Exception:
+        pass
+    pt = prof_phase("meter", pt)
+
+    # subscribed FX parameters
+    try:
+        poll_fx_subs(sock, now)
+        poll_spectrum_subs(sock, now)
     except Exception:
         pass
+    pt = prof_phase("subs", pt)
+    try:
+        poll_api_trace(now)
+        poll_capture(now)
+        poll_fx_catalog()
+        flush_log()
+    except Exception:
+        pass
+
+    # periodic stats (the profiler window restarts after each push)
+    try:
+        if STATS_INTERVAL > 0 and sock is not None and now - last_stats_sent >= STATS_INTERVAL:
+            _send(sock, build_stats(), "stats", replace=True)
+            reset_profile_window()
+            last_stats_sent = now
+    except Exception:
+        pass
+
+    # drop the connection if writes failed for good
+    if sock is not None and (tx_broken or not flush_tx(sock)):
+        try: sock.close()
+        except Exception: pass
+        sock = None
+        clear_commands()
+        reset_tx()
+        next_connect = now + 1.0
+    prof_phase("flush", pt)
+    prof_tick_end()
 
     # defer again
     try:
@@ -1551,8 +4002,20 @@ def main():
     try:
         log("RemoteMixer.py started. v=%s TCP target=%s:%d" % (VERSION, HOST, PORT))
         log("[RemoteMixer v%s] START resource=%s" % (VERSION, _as_str(RPR_GetResourcePath() if "RPR_GetResourcePath" in globals() else "")))
+        if METER_SOURCE != "api":
+            set_meter_source(METER_SOURCE)
+        if PROFILE_API_CALLS:
+            set_api_counting(True)
+        if API_TRACE:
+            set_api_tracing(True)
+        if CAPTURE_ENABLED:
+            start_capture()
+        load_fx_catalog()
         loop()
     except Exception:
-        log("fatal", traceback.format_exc())
+        log_error("fatal", traceback.format_exc())
+        flush_log(True)
 
-main()
+# offline tools (rm_sim.py) load this file with RM_NO_MAIN set and drive it themselves
+if not globals().get("RM_NO_MAIN"):
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# rm_bench.py - offline benchmark for RemoteMixer.py's hot paths
+#
+# Loads RemoteMixer.py against rm_sim's simulated REAPER for a range of
+# session sizes and reports, per scenario, the RPR_* calls, wall time and bytes
+# written to the (simulated) server socket:
+#
+#   cold      one unbudgeted build_state() + the full snapshot it produces
+#   idle      defer ticks with meters moving, transport stopped
+#   play      defer ticks while playing, a fader moved every 10 ticks
+#   packed    the "play" scenario with packed meters negotiated
+#   lookup    find_track_by_guid() on a warm index
+#   fx cold   fx_params() on an FX the metadata cache hasn't seen
+#   fx warm   fx_params() again on the same FX
+#
+# Tick scenarios run the real loop() on a virtual clock advancing by
+# --tick-ms, so the state/meter cadences are the script's own; the
+# (sliced) initial scan is not part of the measured ticks. Wall time includes
+# --latency-us per API call, a rough stand-in for REAPER's own cost.
+#
+#   python rm_bench.py --tracks 10,100,1000 --sends 2 --fx 3 --params 24
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import rm_sim  # noqa: E402
+
+
+class Clock(object):
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _row(name, calls, ms, nbytes, n=1, extra=None):
+    n = max(1, n)
+    row = {"scenario": name, "n": n, "calls": calls / float(n), "ms": sum(ms) / n,
+           "p95Ms": _pct(ms, 0.95), "maxMs": max(ms) if ms else 0.0, "bytes": nbytes / float(n)}
+    if extra:
+        row.update(extra)
+    return row
+
+
+def _msg_types(data):
+    out = {}
+    for line in data.split(b"\n"):
+        if not line:
+            continue
+        try:
+            t = json.loads(line.decode("utf-8")).get("type", "?")
+        except Exception:
+            t = "?"
+        out[t] = out.get(t, 0) + len(line) + 1
+    return out
+
+
+def _session(args, n):
+    sim = rm_sim.SimReaper(tracks=n, sends=args.sends, fx=args.fx, params=args.params,
+                           latency_us=args.latency_us, activity=args.activity, seed=args.seed)
+    rm = rm_sim.load_script(sim)
+    ss = rm_sim.SimSocket()
+    clock = Clock()
+    rm_sim.attach_socket(rm, ss)
+    rm_sim.use_clock(rm, clock)
+    return sim, rm, ss, clock
+
+
+def _ticks(name, args, sim, rm, ss, clock, play=False, fmt="json"):
+    dt = args.tick_ms / 1000.0
+    if play:
+        sim.OnPlayButton()
+    rm["loop"]()  # connects
+    if fmt != "json":
+        rm["set_meter_format"](fmt)
+    # let the sliced initial scan finish and the first snapshot go out
+    for _ in range(100000):
+        clock.t += dt
+        sim.advance(dt)
+        rm["loop"]()
+        if rm["last_scanned_state"] is not None and rm["scan_job"] is None:
+            break
+    ss.take()
+    calls = 0
+    ms = []
+    sent = {}
+    for i in range(args.ticks):
+        clock.t += dt
+        sim.advance(dt)
+        if play and i % 10 == 0:
+            sim.touch()
+        sim.reset_calls()
+        t0 = time.perf_counter()
+        rm["loop"]()
+        ms.append((time.perf_counter() - t0) * 1000.0)
+        calls += sim.total_calls()
+        for t, b in _msg_types(ss.take()).items():
+            sent[t] = sent.get(t, 0) + b
+    return _row(name, calls, ms, sum(sent.values()), args.ticks,
+                {"bytesByType": dict((t, b / float(args.ticks)) for t, b in sent.items())})
+
+
+def bench_size(args, n):
+    rows = []
+
+    sim, rm, ss, clock = _session(args, n)
+    sim.reset_calls()
+    t0 = time.perf_counter()
+    st = rm["build_state"]()
+    ms = (time.perf_counter() - t0) * 1000.0
+    calls = sim.total_calls()
+    rows.append(_row("cold", calls, [ms], len(rm["_safe_json"](rm["full_state_msg"](st))) + 1))
+
+    for name, play, fmt in (("idle", False, "json"), ("play", True, "json"), ("packed", True, "packed")):
+        sim, rm, ss, clock = _session(args, n)
+        rows.append(_ticks(name, args, sim, rm, ss, clock, play, fmt))
+
+    # lookups and FX parameters against the last session (index built by the ticks)
+    guids = [t.guid for t in sim.tracks]
+    sim.reset_calls()
+    t0 = time.perf_counter()
+    for i in range(args.lookups):
+        rm["find_track_by_guid"](guids[(i * 7919) % len(guids)])
+    ms = (time.perf_counter() - t0) * 1000.0
+    rows.append(_row("lookup", sim.total_calls(), [ms / args.lookups] * args.lookups, 0, args.lookups))
+
+    if args.fx:
+        tr = sim.tracks[len(sim.tracks) // 2]
+        for name in ("fx cold", "fx warm"):
+            sim.reset_calls()
+            t0 = time.perf_counter()
+            out = rm["fx_params"](tr.ptr, 0)
+            ms = (time.perf_counter() - t0) * 1000.0
+            msg = {"type": "fxParams", "guid": tr.guid, "fxIndex": 0, "params": out}
+            rows.append(_row(name, sim.total_calls(), [ms], len(rm["_safe_json"](msg)) + 1))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark RemoteMixer.py against a simulated REAPER.")
+    ap.add_argument("--tracks", default="10,100,1000", help="comma separated session sizes")
+    ap.add_argument("--sends", type=int, default=2, help="sends per track")
+    ap.add_argument("--fx", type=int, default=3, help="FX per track")
+    ap.add_argument("--params", type=int, default=24, help="parameters per FX")
+    ap.add_argument("--latency-us", type=float, default=0.0, help="added cost per RPR_* call")
+    ap.add_argument("--activity", type=float, default=0.25, help="share of tracks with signal")
+    ap.add_argument("--ticks", type=int, default=100, help="measured defer ticks per scenario")
+    ap.add_argument("--tick-ms", type=float, default=30.0, help="virtual time between defer ticks")
+    ap.add_argument("--lookups", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    results = []
+    for n in [int(x) for x in args.tracks.split(",") if x.strip()]:
+        for row in bench_size(args, n):
+            row["tracks"] = n
+            results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=1, sort_keys=True))
+        return 0
+    print("%7s  %-8s %10s %9s %9s %9s %10s" % ("tracks", "scenario", "calls/op", "ms/op", "p95 ms", "max ms", "bytes/op"))
+    for r in results:
+        print("%7d  %-8s %10.1f %9.3f %9.3f %9.3f %10.1f" % (r["tracks"], r["scenario"], r["calls"], r["ms"],
+                                                           r["p95Ms"], r["maxMs"], r["bytes"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# rm_replay.py - replay a RemoteMixer traffic capture against rm_sim
+#
+# Reads a journal written by RemoteMixer.py's traffic capture (setCapture, or
+# CAPTURE_ENABLED), rebuilds the captured track layout (same GUIDs and FX
+# counts) in rm_sim's simulated REAPER and feeds every inbound command except
+# capture control (SKIP_TYPES) through handle_cmd(), either at the captured
+# pace (--speed 1), faster (--speed 10) or back to back (--speed 0). Reports
+# throughput, per-command-type latency and RPR_* calls, the bytes the replay
+# sent back, and the outbound volume recorded in the capture for comparison.
+#
+#   python rm_replay.py RemoteMixer.capture-20250101-200000.jsonl --speed 0
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import rm_sim  # noqa: E402
+
+# capture control in the journal would open a new capture from the replay
+SKIP_TYPES = ("setCapture",)
+
+
+def read_journal(path):
+    """(header, [(ms, line)], {type: [msgs, bytes]}, duration ms)"""
+    header = None
+    inbound = []
+    outbound = {}
+    last = 0.0
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            try:
+                rec = json.loads(ln)
+            except ValueError:
+                continue  # torn last line of a capture that was cut off
+            kind = rec[0]
+            if kind == "h":
+                header = rec
+                continue
+            last = max(last, rec[1])
+            if kind == "i":
+                inbound.append((rec[1], rec[2]))
+            elif kind == "o":
+                ent = outbound.setdefault(rec[2], [0, 0])
+                ent[0] += 1
+                ent[1] += rec[3]
+    return header, inbound, outbound, last
+
+
+def _pct(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def replay(args):
+    header, inbound, outbound, duration = read_journal(args.journal)
+    layout = header[4] if header else []
+    if layout:
+        sim = rm_sim.SimReaper(tracks=0, latency_us=args.latency_us, seed=args.seed)
+        sim.load_layout(layout, params=args.params)
+        sim.add_random_sends(args.sends)
+    else:
+        sim = rm_sim.SimReaper(tracks=args.tracks, sends=args.sends, fx=args.fx, params=args.params,
+                               latency_us=args.latency_us, seed=args.seed)
+    rm = rm_sim.load_script(sim)
+    ss = rm_sim.SimSocket()
+    handle_cmd = rm["handle_cmd"]
+    known = set(t.guid for t in sim.tracks)
+
+    per_type = {}
+    malformed = 0
+    missing = 0
+    skipped = 0
+    t_start = time.perf_counter()
+    for ms, line in inbound:
+        if args.speed > 0:
+            due = t_start + ms / 1000.0 / args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        try:
+            cmd = json.loads(line)
+        except ValueError:
+            cmd = None
+        if not isinstance(cmd, dict):
+            malformed += 1
+            continue
+        typ = cmd.get("type", "?")
+        if typ in SKIP_TYPES:
+            skipped += 1
+            continue
+        if typ == "batch" and isinstance(cmd.get("cmds"), list):
+            subs = [c for c in cmd["cmds"] if not (isinstance(c, dict) and c.get("type") in SKIP_TYPES)]
+            skipped += len(cmd["cmds"]) - len(subs)
+            cmd["cmds"] = subs
+        guid = cmd.get("guid")
+        if guid and guid not in known and guid not in ("MASTER", "{MASTER}"):
+            missing += 1
+        sim.reset_calls()
+        t0 = time.perf_counter()
+        handle_cmd(cmd, ss)
+        dt = (time.perf_counter() - t0) * 1000.0
+        ent = per_type.setdefault(typ, {"n": 0, "ms": [], "calls": 0, "bytes": 0})
+        ent["n"] += 1
+        ent["ms"].append(dt)
+        ent["calls"] += sim.total_calls()
+        ent["bytes"] += len(ss.take())
+    wall = time.perf_counter() - t_start
+
+    n = sum(e["n"] for e in per_type.values())
+    busy = sum(sum(e["ms"]) for e in per_type.values())
+    types = []
+    for typ, e in sorted(per_type.items(), key=lambda kv: -sum(kv[1]["ms"])):
+        types.append({"type": typ, "n": e["n"], "totalMs": round(sum(e["ms"]), 3),
+                      "p50Ms": round(_pct(e["ms"], 0.5), 4), "p95Ms": round(_pct(e["ms"], 0.95), 4),
+                      "maxMs": round(max(e["ms"]), 4), "callsPerCmd": round(e["calls"] / float(e["n"]), 1),
+                      "replyBytes": e["bytes"]})
+    return {"journal": args.journal, "version": header[2] if header else None,
+            "tracks": len(sim.tracks), "commands": n, "malformed": malformed, "skipped": skipped,
+            "unknownGuid": missing, "capturedSec": round(duration / 1000.0, 3),
+            "wallSec": round(wall, 3), "busyMs": round(busy, 3),
+            "cmdsPerSec": round(n / busy * 1000.0, 1) if busy else 0.0,
+            "types": types,
+            "capturedOut": dict((t, {"msgs": m, "bytes": b}) for t, (m, b) in outbound.items())}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a RemoteMixer traffic capture against a simulated REAPER.")
+    ap.add_argument("journal")
+    ap.add_argument("--speed", type=float, default=0.0,
+                    help="1 = captured pace, N = N times faster, 0 = no waiting")
+    ap.add_argument("--params", type=int, default=16, help="parameters per simulated FX")
+    ap.add_argument("--sends", type=int, default=2, help="random sends per track")
+    ap.add_argument("--tracks", type=int, default=32, help="tracks when the journal has no layout")
+    ap.add_argument("--fx", type=int, default=2, help="FX per track when the journal has no layout")
+    ap.add_argument("--latency-us", type=float, default=0.0, help="added cost per RPR_* call")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    r = replay(args)
+    if args.json:
+        print(json.dumps(r, indent=1, sort_keys=True))
+        return 0
+    print("%s: %d commands over %.1fs captured, %d tracks (%d malformed, %d skipped, %d for unknown tracks)"
+          % (r["journal"], r["commands"], r["capturedSec"], r["tracks"], r["malformed"], r["skipped"],
+             r["unknownGuid"]))
+    print("replayed in %.3fs wall, %.1f ms in handle_cmd, %.0f cmds/s" % (r["wallSec"], r["busyMs"], r["cmdsPerSec"]))
+    print("%-22s %7s %10s %9s %9s %9s %9s %10s" % ("type", "n", "total ms", "p50 ms", "p95 ms", "max ms",
+                                                   "calls/cmd", "reply B"))
+    for t in r["types"]:
+        print("%-22s %7d %10.3f %9.4f %9.4f %9.4f %9.1f %10d" % (t["type"], t["n"], t["totalMs"], t["p50Ms"],
+                                                                t["p95Ms"], t["maxMs"], t["callsPerCmd"],
+                                                                t["replyBytes"]))
+    if r["capturedOut"]:
+        print("captured outbound:")
+        for t, e in sorted(r["capturedOut"].items(), key=lambda kv: -kv[1]["bytes"]):
+            print("  %-20s %8d msgs %12d bytes" % (t, e["msgs"], e["bytes"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,682 @@
+# -*- coding: utf-8 -*-
+# rm_sim.py - simulated REAPER API for running RemoteMixer.py outside REAPER
+#
+# SimReaper models a project (tracks, sends/receives, FX with parameters,
+# meters, transport) and exposes it as an RPR_* namespace that mimics
+# ReaScript's Python calling convention: handles are pointer strings, and
+# functions with output buffers return (retval, args...) tuples. Every call
+# is counted per function and can be slowed down by a fixed latency to
+# approximate REAPER's main-thread API cost.
+#
+#   sim = SimReaper(tracks=100, sends=2, fx=3, params=24)
+#   rm = load_script(sim)            # RemoteMixer.py globals, main() not run
+#   rm["build_state"](); print(sim.total_calls())
+#
+# Used by rm_bench.py and rm_replay.py.
+
+from __future__ import print_function
+import os
+import random
+import socket
+import tempfile
+import time
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "RemoteMixer.py")
+
+# telemetry sliders as (label, max); all ranges start at 0 like the shipped JSFX
+RM_FX = (
+    ("JS: RM_Compressor2 [Telemetry]", (("In Peak", 1.0), ("Sidechain Peak", 1.0), ("Out Peak", 1.0),
+                                        ("GR (dB)", 24.0))),
+    ("JS: RM_LA1A [Telemetry]", (("GR (dB)", 24.0),)),
+    ("JS: RM_Limiter2 [Telemetry]", (("In Peak", 1.0), ("Out Peak", 1.0), ("Atten (dB)", 30.0))),
+)
+TRACK_DEFAULTS = {"D_VOL": 1.0, "D_PAN": 0.0, "B_MUTE": 0.0, "I_SOLO": 0.0, "I_RECARM": 0.0, "I_RECMON": 0.0,
+                  "I_RECINPUT": 0.0, "I_FOLDERDEPTH": 0.0, "I_FOLDERCOMPACT": 0.0,
+                  "I_SPACER": 0.0, "I_CUSTOMCOLOR": 0.0, "I_SELECTED": 0.0}
+LINK_DEFAULTS = {"D_VOL": 1.0, "D_PAN": 0.0, "B_MUTE": 0.0, "I_SENDMODE": 0.0,
+                 "I_SRCCHAN": 0.0, "I_DSTCHAN": 0.0}
+
+
+def api(fn):
+    """Marks a SimReaper method as an RPR_* function."""
+    fn.rpr = True
+    return fn
+
+
+class SimFx(object):
+    def __init__(self, guid, name, params):
+        self.guid = guid
+        self.name = name
+        self.enabled = True
+        # [name, normalized value, min, max]
+        self.params = [list(p) for p in params]
+
+
+class SimTrack(object):
+    def __init__(self, guid, name):
+        self.guid = guid
+        self.name = name
+        self.info = dict(TRACK_DEFAULTS)
+        self.fx = []
+        self.peak = [0.0, 0.0]
+
+
+class SimReaper(object):
+    def __init__(self, tracks=10, sends=2, fx=2, params=16, latency_us=0.0,
+                 activity=0.25, seed=1, resource_path=None):
+        self.rnd = random.Random(seed)
+        self.latency = latency_us / 1e6
+        self.activity = activity
+        self.resource_path = resource_path or tempfile.mkdtemp(prefix="rm_sim_")
+        self.calls = {}
+        self.ptrs = {}  # pointer string -> SimTrack
+        self.guid_ptrs = {}  # "(GUID*)..." -> guid string
+        self.serial = 0
+        self.change_count = 1
+        self.play_state = 0
+        self.position = 0.0
+        self.bpm = 120.0
+        self.gmem = {}
+        self.installed = [("JS: %s" % n.split(": ", 1)[1], n.split(": ", 1)[1].split(" ")[0] + ".jsfx")
+                          for n, _ in RM_FX]
+        self.installed += [("VST: ReaEQ (Cockos)", "reaeq.dll"), ("VST: ReaComp (Cockos)", "reacomp.dll")]
+        self.master = self._new_track("MASTER")
+        self.tracks = []
+        self.links = []
+        self._links_dirty = True
+        for i in range(tracks):
+            tr = self._new_track("Track %d" % (i + 1))
+            for k in range(fx):
+                tr.fx.append(self._new_fx(k, params))
+            self.tracks.append(tr)
+        self.add_random_sends(sends)
+
+    # --- model ---
+    def _ptr(self, kind):
+        self.serial += 1
+        return "(%s*)0x%016X" % (kind, 0x10000 + self.serial * 0x40)
+
+    def _new_guid(self):
+        self.serial += 1
+        return "{%08X-%04X-%04X-%04X-%012X}" % (self.rnd.getrandbits(32), self.serial & 0xFFFF,
+                                                self.rnd.getrandbits(16), self.rnd.getrandbits(16),
+                                                self.rnd.getrandbits(48))
+
+    def _new_track(self, name):
+        tr = SimTrack(self._new_guid(), name)
+        tr.ptr = self._ptr("MediaTrack")
+        tr.guid_ptr = self._ptr("GUID")
+        self.ptrs[tr.ptr] = tr
+        self.guid_ptrs[tr.guid_ptr] = tr.guid
+        return tr
+
+    def _new_fx(self, k, params):
+        if k % 3 == 1:
+            name, telemetry = RM_FX[(k // 3) % len(RM_FX)]
+        else:
+            name, telemetry = "VST: ReaEQ (Cockos)", ()
+        ps = [["Param %d" % (p + 1), self.rnd.random(), 0.0, 1.0] for p in range(params)]
+        ps += [["Z Telemetry: %s" % t, 0.0, 0.0, hi] for t, hi in telemetry]
+        fx = SimFx(self._new_guid(), name, ps)
+        fx.guid_ptr = self._ptr("GUID")
+        self.guid_ptrs[fx.guid_ptr] = fx.guid
+        return fx
+
+    def _add_link(self, src, dest):
+        link = dict(LINK_DEFAULTS)
+        link["src"] = src
+        link["dest"] = dest
+        self.links.append(link)
+        self._links_dirty = True
+        return link
+
+    def _reindex(self):
+        # receives live on the destination in creation order; a source's
+        # sends are numbered in destination-track order
+        pos = dict((id(t), i) for i, t in enumerate(self.tracks))
+        self._recvs = {}
+        self._sends = {}
+        for s in self.links:
+            self._recvs.setdefault(id(s["dest"]), []).append(s)
+        for s in sorted(self.links, key=lambda s: pos.get(id(s["dest"]), 1 << 30)):
+            self._sends.setdefault(id(s["src"]), []).append(s)
+        self._links_dirty = False
+
+    def _link_list(self, tr, cat):
+        if self._links_dirty:
+            self._reindex()
+        if cat == 0:
+            return self._sends.get(id(tr), [])
+        if cat < 0:
+            return self._recvs.get(id(tr), [])
+        return []
+
+    def _track(self, ptr):
+        tr = self.ptrs.get(ptr)
+        if tr is None:
+            raise ValueError("invalid MediaTrack %r" % (ptr,))
+        return tr
+
+    def _changed(self):
+        self.change_count += 1
+
+    def _all(self):
+        return [self.master] + self.tracks
+
+    def add_random_sends(self, per_track):
+        for tr in self.tracks:
+            for k in range(per_track):
+                dest = self.tracks[self.rnd.randrange(len(self.tracks))]
+                if dest is not tr:
+                    self._add_link(tr, dest)
+        self._changed()
+
+    def load_layout(self, layout, params=16):
+        """Replace the tracks with [[guid, fx count], ...] (a capture header's layout)."""
+        for tr in self.tracks:
+            del self.ptrs[tr.ptr]
+        self.tracks = []
+        self.links = []
+        self._links_dirty = True
+        for i, (guid, nfx) in enumerate(layout):
+            tr = self._new_track("Track %d" % (i + 1))
+            tr.guid = guid
+            self.guid_ptrs[tr.guid_ptr] = guid
+            for k in range(int(nfx)):
+                tr.fx.append(self._new_fx(k, params))
+            self.tracks.append(tr)
+        self._changed()
+
+    # --- driving the session ---
+    def advance(self, dt=0.02):
+        """Move meters (an `activity` share of tracks carries signal) and the play cursor."""
+        for tr in self._all():
+            if self.rnd.random() < self.activity:
+                tr.peak = [self.rnd.uniform(0.05, 0.9), self.rnd.uniform(0.05, 0.9)]
+            else:
+                tr.peak = [0.0, 0.0]
+            for fx in tr.fx:
+                for p in fx.params:
+                    if p[0].startswith("Z Telemetry") and tr.peak[0]:
+                        p[1] = tr.peak[0]
+        if self.play_state & 1:
+            self.position += dt
+
+    def touch(self, n=1):
+        """User edits in REAPER: move n random faders."""
+        for _ in range(n):
+            tr = self.tracks[self.rnd.randrange(len(self.tracks))]
+            tr.info["D_VOL"] = self.rnd.uniform(0.1, 1.5)
+        self._changed()
+
+    def reset_calls(self):
+        self.calls = {}
+
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def namespace(self):
+        """RPR_* functions bound to this session, counting calls."""
+        ns = {}
+        for name in dir(self):
+            fn = getattr(self, name)
+            if getattr(fn, "rpr", False):
+                ns["RPR_" + name] = self._wrap(name, fn)
+        return ns
+
+    def _wrap(self, name, fn):
+        latency = self.latency
+
+        def call(*a):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if latency:
+                end = time.perf_counter() + latency
+                while time.perf_counter() < end:
+                    pass
+            return fn(*a)
+        call.__name__ = "RPR_" + name
+        return call
+
+    # --- project / transport ---
+    @api
+    def EnumProjects(self, idx, buf="", sz=0):
+        return ("(ReaProject*)0x0000000000001000", idx, os.path.join(self.resource_path, "sim.rpp"), sz)
+
+    @api
+    def GetProjectName(self, proj, buf="", sz=0):
+        return (proj, "sim.rpp", sz)
+
+    @api
+    def GetProjectStateChangeCount(self, proj):
+        return self.change_count
+
+    @api
+    def GetResourcePath(self):
+        return self.resource_path
+
+    @api
+    def GetAppVersion(self):
+        return "7.0/sim"
+
+    @api
+    def GetPlayState(self):
+        return self.play_state
+
+    @api
+    def GetPlayPosition2(self):
+        return self.position
+
+    @api
+    def GetPlayPosition(self):
+        return self.position
+
+    @api
+    def GetCursorPosition(self):
+        return self.position
+
+    @api
+    def TimeMap_GetDividedBpm(self, proj):
+        return self.bpm
+
+    @api
+    def Master_GetTempo(self):
+        return self.bpm
+
+    @api
+    def TimeMap2_timeToBeats(self, proj, t, meas=0, cml=0, full=0, cdenom=0):
+        beats = t * self.bpm / 60.0
+        return (beats % 4, proj, t, int(beats // 4), 4, beats, 4)
+
+    @api
+    def SetCurrentBPM(self, proj, bpm, undo):
+        self.bpm = float(bpm)
+        self._changed()
+
+    @api
+    def OnPlayButton(self):
+        self.play_state = 1
+
+    @api
+    def OnPauseButton(self):
+        self.play_state = 2
+
+    @api
+    def OnStopButton(self):
+        self.play_state = 0
+
+    @api
+    def OnRecordButton(self):
+        self.play_state = 5
+
+    @api
+    def defer(self, code):
+        return None
+
+    @api
+    def time_precise(self):
+        return time.perf_counter()
+
+    # --- tracks ---
+    @api
+    def CountTracks(self, proj):
+        return len(self.tracks)
+
+    @api
+    def GetTrack(self, proj, idx):
+        return self.tracks[idx].ptr if 0 <= idx < len(self.tracks) else None
+
+    @api
+    def GetMasterTrack(self, proj):
+        return self.master.ptr
+
+    @api
+    def ValidatePtr2(self, proj, ptr, typename):
+        tr = self.ptrs.get(ptr)
+        return tr is not None and (tr is self.master or tr in self.tracks)
+
+    @api
+    def GetTrackGUID(self, tr):
+        return self._track(tr).guid_ptr
+
+    @api
+    def guidToString(self, guid_ptr, *buf):
+        return (guid_ptr, self.guid_ptrs.get(guid_ptr, ""))
+
+    @api
+    def GetTrackName(self, tr, buf="", sz=0):
+        return (True, tr, self._track(tr).name, sz)
+
+    @api
+    def GetSetMediaTrackInfo_String(self, tr, parm, val, set_new):
+        t = self._track(tr)
+        if parm == "P_NAME":
+            if set_new:
+                t.name = val
+                self._changed()
+            return (True, tr, parm, t.name, set_new)
+        return (False, tr, parm, "", set_new)
+
+    @api
+    def GetMediaTrackInfo_Value(self, tr, parm):
+        t = self._track(tr)
+        if parm == "IP_TRACKNUMBER":
+            return -1.0 if t is self.master else float(self.tracks.index(t) + 1)
+        return float(t.info.get(parm, 0.0))
+
+    @api
+    def SetMediaTrackInfo_Value(self, tr, parm, val):
+        self._track(tr).info[parm] = float(val)
+        self._changed()
+        return True
+
+    @api
+    def GetTrackDepth(self, tr):
+        depth = 0
+        for t in self.tracks:
+            if t.ptr == tr:
+                return depth
+            depth = max(0, depth + int(t.info["I_FOLDERDEPTH"]))
+        return 0
+
+    @api
+    def GetTrackColor(self, tr):
+        return int(self._track(tr).info["I_CUSTOMCOLOR"])
+
+    @api
+    def SetTrackColor(self, tr, color):
+        self._track(tr).info["I_CUSTOMCOLOR"] = float(int(color) | 0x1000000)
+        self._changed()
+
+    @api
+    def InsertTrackAtIndex(self, idx, defaults):
+        tr = self._new_track("")
+        self.tracks.insert(max(0, min(int(idx), len(self.tracks))), tr)
+        self._links_dirty = True
+        self._changed()
+
+    @api
+    def DeleteTrack(self, tr):
+        t = self._track(tr)
+        self.tracks.remove(t)
+        self.links = [s for s in self.links if s["src"] is not t and s["dest"] is not t]
+        self._links_dirty = True
+        self._changed()
+
+    @api
+    def SetOnlyTrackSelected(self, tr):
+        for t in self._all():
+            t.info["I_SELECTED"] = 1.0 if t.ptr == tr else 0.0
+
+    @api
+    def ReorderSelectedTracks(self, before, make_folder):
+        sel = [t for t in self.tracks if t.info["I_SELECTED"]]
+        rest = [t for t in self.tracks if not t.info["I_SELECTED"]]
+        before = max(0, min(int(before), len(self.tracks)))
+        anchor = self.tracks[before] if before < len(self.tracks) else None
+        while anchor is not None and anchor in sel:
+            i = self.tracks.index(anchor) + 1
+            anchor = self.tracks[i] if i < len(self.tracks) else None
+        at = rest.index(anchor) if anchor is not None else len(rest)
+        self.tracks = rest[:at] + sel + rest[at:]
+        self._links_dirty = True
+        self._changed()
+        return True
+
+    @api
+    def TrackList_AdjustWindows(self, minor):
+        pass
+
+    @api
+    def UpdateArrange(self):
+        pass
+
+    @api
+    def PreventUIRefresh(self, n):
+        pass
+
+    @api
+    def Undo_BeginBlock2(self, proj):
+        pass
+
+    @api
+    def Undo_EndBlock2(self, proj, desc, flags):
+        pass
+
+    # --- meters ---
+    @api
+    def Track_GetPeakInfo(self, tr, ch):
+        return self._track(tr).peak[ch & 1]
+
+    @api
+    def GetTrackUIPeakHoldDB(self, tr, ch, clear):
+        pk = self._track(tr).peak[ch & 1]
+        return 20.0 * __import__("math").log10(pk) if pk > 0 else -150.0
+
+    @api
+    def gmem_attach(self, name):
+        pass
+
+    @api
+    def gmem_read(self, i):
+        return self.gmem.get(int(i), 0.0)
+
+    @api
+    def gmem_write(self, i, v):
+        self.gmem[int(i)] = v
+
+    # --- sends / receives ---
+    @api
+    def GetTrackNumSends(self, tr, cat):
+        return len(self._link_list(self._track(tr), cat))
+
+    @api
+    def GetTrackSendInfo_Value(self, tr, cat, idx, parm):
+        link = self._link_list(self._track(tr), cat)[idx]
+        if parm == "P_DESTTRACK":
+            return link["dest"].ptr
+        if parm == "P_SRCTRACK":
+            return link["src"].ptr
+        return float(link.get(parm, 0.0))
+
+    @api
+    def SetTrackSendInfo_Value(self, tr, cat, idx, parm, val):
+        self._link_list(self._track(tr), cat)[idx][parm] = float(val)
+        self._changed()
+        return True
+
+    @api
+    def CreateTrackSend(self, src, dest):
+        s = self._track(src)
+        link = self._add_link(s, self._track(dest))
+        self._changed()
+        return self._link_list(s, 0).index(link)
+
+    # --- FX ---
+    def _fx(self, tr, i):
+        return self._track(tr).fx[int(i)]
+
+    @api
+    def TrackFX_GetCount(self, tr):
+        return len(self._track(tr).fx)
+
+    @api
+    def TrackFX_GetFXName(self, tr, i, buf="", sz=0):
+        return (True, tr, i, self._fx(tr, i).name, sz)
+
+    @api
+    def TrackFX_GetFXGUID(self, tr, i):
+        return self._fx(tr, i).guid_ptr
+
+    @api
+    def TrackFX_GetEnabled(self, tr, i):
+        return self._fx(tr, i).enabled
+
+    @api
+    def TrackFX_SetEnabled(self, tr, i, en):
+        self._fx(tr, i).enabled = bool(en)
+        self._changed()
+
+    @api
+    def TrackFX_GetNumParams(self, tr, i):
+        return len(self._fx(tr, i).params)
+
+    @api
+    def TrackFX_GetParamName(self, tr, i, p, buf="", sz=0):
+        return (True, tr, i, p, self._fx(tr, i).params[p][0], sz)
+
+    @api
+    def TrackFX_GetParamNormalized(self, tr, i, p):
+        return self._fx(tr, i).params[p][1]
+
+    @api
+    def TrackFX_GetParam(self, tr, i, p, mn=0.0, mx=0.0):
+        name, v, lo, hi = self._fx(tr, i).params[p]
+        return (lo + v * (hi - lo), tr, i, p, lo, hi)
+
+    @api
+    def TrackFX_GetParamEx(self, tr, i, p, mn=0.0, mx=0.0, mid=0.0):
+        name, v, lo, hi = self._fx(tr, i).params[p]
+        return (lo + v * (hi - lo), tr, i, p, lo, hi, (lo + hi) / 2.0)
+
+    @api
+    def TrackFX_GetFormattedParamValue(self, tr, i, p, buf="", sz=0):
+        return (True, tr, i, p, "%.2f" % self._fx(tr, i).params[p][1], sz)
+
+    @api
+    def TrackFX_SetParamNormalized(self, tr, i, p, v):
+        self._fx(tr, i).params[p][1] = min(1.0, max(0.0, float(v)))
+        return True
+
+    @api
+    def TrackFX_SetParam(self, tr, i, p, v):
+        par = self._fx(tr, i).params[p]
+        par[1] = (float(v) - par[2]) / ((par[3] - par[2]) or 1.0)
+        return True
+
+    @api
+    def TrackFX_AddByName(self, tr, name, rec, instantiate):
+        t = self._track(tr)
+        key = name.split(":", 1)[-1].strip().lower()
+        for i, fx in enumerate(t.fx):
+            if key and key in fx.name.lower():
+                if instantiate <= 0:
+                    return i
+                break
+        if instantiate == 0:
+            return -1
+        for inst, ident in self.installed:
+            if key and key in inst.lower():
+                fx = self._new_fx(0, 8)
+                fx.name = inst
+                t.fx.append(fx)
+                self._changed()
+                return len(t.fx) - 1
+        return -1
+
+    @api
+    def TrackFX_Delete(self, tr, i):
+        del self._track(tr).fx[int(i)]
+        self._changed()
+        return True
+
+    @api
+    def TrackFX_CopyToTrack(self, src, i, dest, j, move):
+        s = self._track(src)
+        fx = s.fx[int(i)]
+        if move:
+            s.fx.remove(fx)
+        else:
+            fx = self._new_fx(0, 0)
+            fx.name = s.fx[int(i)].name
+            fx.params = [list(p) for p in s.fx[int(i)].params]
+        d = self._track(dest)
+        d.fx.insert(min(int(j), len(d.fx)), fx)
+        self._changed()
+
+    @api
+    def TrackFX_Show(self, tr, i, flag):
+        pass
+
+    @api
+    def EnumInstalledFX(self, i, name="", nsz=0, ident="", isz=0):
+        if 0 <= i < len(self.installed):
+            n, d = self.installed[i]
+            return (True, i, n, nsz, d, isz)
+        return (False, i, "", nsz, "", isz)
+
+
+class SimSocket(object):
+    """Non-blocking socket stand-in: records what the script sends and hands
+    it whatever was fed with feed()."""
+
+    def __init__(self):
+        self.inbound = []
+        self.sent = []  # bytes per send() call
+        self.closed = False
+
+    def feed(self, data):
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        self.inbound.append(data)
+
+    def take(self):
+        """Bytes sent since the last take()."""
+        out = b"".join(self.sent)
+        self.sent = []
+        return out
+
+    def connect(self, addr):
+        pass
+
+    def settimeout(self, t):
+        pass
+
+    def setblocking(self, flag):
+        pass
+
+    def recv(self, n):
+        if not self.inbound:
+            raise BlockingIOError()
+        data = self.inbound.pop(0)
+        if len(data) > n:
+            self.inbound.insert(0, data[n:])
+            data = data[:n]
+        return data
+
+    def send(self, data):
+        data = bytes(data)
+        self.sent.append(data)
+        return len(data)
+
+    def sendall(self, data):
+        self.send(data)
+
+    def close(self):
+        self.closed = True
+
+
+def load_script(sim, path=SCRIPT_PATH, extra=None):
+    """Run RemoteMixer.py against sim without starting its loop; returns its globals."""
+    g = sim.namespace()
+    g["__name__"] = "RemoteMixer"
+    g["SCRIPT_DIR"] = sim.resource_path
+    g["RM_NO_MAIN"] = True
+    if extra:
+        g.update(extra)
+    with open(path, "r", encoding="utf-8") as f:
+        src = f.read()
+    exec(compile(src, path, "exec"), g)
+    return g
+
+
+def attach_socket(rm, ss):
+    """Make the loaded script's connect() open ss instead of a TCP socket."""
+    shim = type(socket)("socket")
+    shim.__dict__.update(socket.__dict__)
+    shim.socket = lambda *a, **kw: ss
+    rm["socket"] = shim
+
+
+def use_clock(rm, clock):
+    """Drive the script's wall clock (_now) from clock(), e.g. a virtual one."""
+    rm["_now"] = clock
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# test_rm_telemetry.py - RM_* telemetry layout/frames against rm_sim
+#
+#   python -m pytest Scripts/test_rm_telemetry.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import rm_sim  # noqa: E402
+
+
+def _session():
+    # fx index 1 on every track is an RM_* FX with telemetry (see rm_sim._new_fx)
+    sim = rm_sim.SimReaper(tracks=2, sends=0, fx=2, params=2)
+    rm = rm_sim.load_script(sim)
+    rm["build_state"]()
+    return sim, rm
+
+
+def _to_units(layout_fx, row, label):
+    k = layout_fx["labels"].index(label)
+    lo, hi = layout_fx["min"][k], layout_fx["max"][k]
+    return lo + row[k] * (hi - lo)
+
+
+def test_layout_carries_slider_ranges():
+    sim, rm = _session()
+    layout = rm["telemetry_msgs"](0.0)[0]
+    assert layout["type"] == "telemetryLayout"
+    comp = layout["fx"][0]
+    assert comp["name"].startswith("JS: RM_Compressor2")
+    k = comp["labels"].index("GR (dB)")
+    assert (comp["min"][k], comp["max"][k]) == (0.0, 24.0)
+    assert len(comp["min"]) == len(comp["max"]) == len(comp["params"])
+
+
+def test_gr_round_trips_to_db():
+    sim, rm = _session()
+    tr = sim.tracks[0]
+    comp = tr.fx[1]
+    p = [q[0] for q in comp.params].index("Z Telemetry: GR (dB)")
+    comp.params[p][1] = 6.0 / 24.0  # 6 dB of gain reduction, normalized
+    msgs = rm["telemetry_msgs"](0.0)
+    layout = [m for m in msgs if m["type"] == "telemetryLayout"][0]
+    frame = [m for m in msgs if m["type"] == "telemetry"][0]
+    i = [(f["guid"], f["fxIndex"]) for f in layout["fx"]].index((tr.guid, 1))
+    assert abs(_to_units(layout["fx"][i], frame["v"][i], "GR (dB)") - 6.0) < 0.01
@@ -7928,6 +7928,31 @@ applyResponsiveMode();
         }
         return;
       }
+      if (msg.type === "fxParamDelta"){
+        // Changed params only: [[index, value, fmt, raw], ...]
+        const patch = (params)=>{
+          if (!Array.isArray(params)) return false;
+          let hit = false;
+          for (const [i, value, fmt, raw] of (msg.p || [])){
+            const p = (params[i] && params[i].index === i) ? params[i] : params.find(q => q.index === i);
+            if (!p) continue;
+            p.value = value;
+            p.fmt = fmt;
+            p.raw = raw;
+            hit = true;
+          }
+          return hit;
+        };
+        try{
+          const w = pluginWins.get(`${msg.guid}:${msg.fxIndex}`);
+          if (w && patch(w.params)) renderPluginWin(w);
+        }catch(_){ }
+        if (openModal && openModal.guid === msg.guid && openModal.tab === "fxparams"
+            && openModal.fxIndex === msg.fxIndex && patch(openModal.fxParams)){
+          renderModal();
+        }
+        return;
+      }
       if (msg.type === "fxPresets"){
         const key = presetKeyFromName(msg.fxName || "");
         if (!key) return;
@@ -214,6 +214,38 @@ function canControl(ws, guid){
   return allowed.has(guid);
 }
 
+// control commands that target a track, checked against the user's assignments
+const needsGuid = new Set([
+  "setVol","setPan","setMute","setSolo","setRec","setRecInput",
+  "setFxEnabled","setFxAllEnabled","deleteFx","setFxParam","addFx","moveFx","showFxChain",
+  "reqFxList","reqFxParams","subscribeFxParams","unsubscribeFxParams",
+  "subscribeSpectrum","unsubscribeSpectrum",
+  "setSendVol","setSendMute","setSendMode","setSendSrcChan","setSendDstChan","addSend",
+  "setRecvVol","setRecvMute","setRecvSrcChan","setRecvDstChan","addReturn",
+  "renameTrack","setTrackColor","moveTrack","createFolderWithTrack","moveTrackToFolder",
+  "deleteTrack","setSpacer","installMeterFx"
+]);
+// track commands whose guid-less form applies to every track (admin only)
+const allTracksWithoutGuid = new Set(["installMeterFx"]);
+// project-wide commands that change things for every client
+const adminOnly = new Set(["setMeterSource","reqLog","setCapture","setApiTrace","reqApiTrace",
+  "reqStats","setProfile"]);
+
+function isAdmin(ws){
+  if (!currentProjectId || !ws.user) return false;
+  return ws.user === ensureProjectCfg(currentProjectId).admin;
+}
+
+function canForward(ws, msg){
+  if (adminOnly.has(msg.type)) return isAdmin(ws);
+  if (!needsGuid.has(msg.type)) return true;
+  const guid = String(msg.guid||"");
+  if (!guid) return allTracksWithoutGuid.has(msg.type) && isAdmin(ws);
+  // master only controllable by admin/main
+  if (guid === "MASTER" || guid === "{MASTER}") return isAdmin(ws);
+  return canControl(ws, guid);
+}
+
 let lastState = null;
 let lastMeter = null;
 
@@ -345,38 +377,331 @@ wss.on("connection", (ws) => {
     }
 
     // pass-through control commands to REAPER over TCP, but validate permissions
-    const needsGuid = new Set([
-      "setVol","setPan","setMute","setSolo","setRec","setRecInput",
-      "setFxEnabled","setFxAllEnabled","deleteFx","setFxParam","addFx","moveFx","showFxChain",
-      "reqFxList","reqFxParams",
-      "setSendVol","setSendMute","setSendMode","setSendSrcChan","setSendDstChan","addSend",
-      "setRecvVol","setRecvMute","setRecvSrcChan","setRecvDstChan","addReturn",
-      "renameTrack","setTrackColor","moveTrack","createFolderWithTrack","moveTrackToFolder",
-      "deleteTrack","setSpacer"
-    ]);
-    if (needsGuid.has(msg.type)){
-      const guid = String(msg.guid||"");
-      if (!guid) return;
-      // master only controllable by admin/main
-      if (guid === "MASTER" || guid === "{MASTER}"){
-        const cfg = ensureProjectCfg(currentProjectId);
-        if (ws.user !== cfg.admin) return;
-      }else{
-        if (!canControl(ws, guid)) return;
+    if (msg.type === "batch"){
+      // all-or-nothing: every sub-command must pass the same checks
+      if (!Array.isArray(msg.cmds) || !msg.cmds.length) return;
+      for (const sub of msg.cmds){
+        if (!sub || !sub.type || sub.type === "batch") return;
+        if (!canForward(ws, sub)) return;
       }
+    } else if (!canForward(ws, msg)) return;
+    // FX editors: serve params from subscriptions instead of asking REAPER each time
+    if (msg.type === "subscribeFxParams"){
+      const sub = fxSubscribe(ws, msg.guid, msg.fxIndex, msg.rate, false);
+      if (sub.params) sendTo(ws, {type:"fxParams", guid:sub.guid, fxIndex:sub.fxIndex, params:sub.params});
+      return;
+    }
+    if (msg.type === "unsubscribeFxParams"){
+      const sub = fxSubs.get(fxSubKey(msg.guid, msg.fxIndex));
+      if (sub) fxRelease(ws, sub);
+      return;
+    }
+    if (msg.type === "subscribeSpectrum"){
+      specSubscribe(ws, msg.guid, msg.fxIndex, msg.rate);
+      return;
+    }
+    if (msg.type === "unsubscribeSpectrum"){
+      const sub = specSubs.get(fxSubKey(msg.guid, msg.fxIndex));
+      if (sub) specRelease(ws, sub);
+      return;
+    }
+    if (msg.type === "reqFxParams" && reaperSock && Date.now() >= fxSubRejectUntil){
+      const prev = fxSubs.get(fxSubKey(msg.guid, msg.fxIndex));
+      const last = prev && prev.leases.get(ws);
+      const sub = fxSubscribe(ws, msg.guid, msg.fxIndex, fxPollRate(last), true);
+      if (sub.params) sendTo(ws, {type:"fxParams", guid:sub.guid, fxIndex:sub.fxIndex, params:sub.params});
+      return;
+    }
+    if (msg.type === "reqStats" || msg.type === "setProfile"){
+      if (msg.watch === false) statsWatchers.delete(ws);
+      else statsWatchers.add(ws);
     }
     // forward to REAPER
     if (reaperSock){
+      if (routedCmds.has(msg.type)) msg = expectReply(ws, msg);
       try{ reaperSock.write(JSON.stringify(msg) + "\n"); }catch{}
     }
   });
 
-  ws.on("close", ()=>{ wsClients.delete(ws); });
+  ws.on("close", ()=>{
+    wsClients.delete(ws);
+    for (const sub of Array.from(fxSubs.values())) fxRelease(ws, sub);
+    for (const sub of Array.from(specSubs.values())) specRelease(ws, sub);
+    for (const [id, p] of Array.from(pendingReplies)) if (p.ws === ws) pendingReplies.delete(id);
+    statsWatchers.delete(ws);
+  });
 });
 
 // ---- TCP server (REAPER -> Node) ----
 let reaperSock = null;
 
+function publishState(st){
+  // update project
+  const pName = st.projectName || "Untitled";
+  const pPath = st.projectPath || "";
+  const pid = getProjectId(pPath, pName);
+  const changed = (pid !== currentProjectId);
+  currentProjectId = pid;
+  currentProjectName = pName;
+  currentProjectPath = pPath;
+  const cfg = ensureProjectCfg(currentProjectId);
+  cfg.projectName = currentProjectName;
+  projects[currentProjectId] = cfg;
+  if (changed) broadcastProjectInfo();
+
+  lastState = st;
+  // broadcast filtered
+  for (const ws of wsClients){
+    sendTo(ws, filterStateFor(ws, st));
+  }
+}
+
+// Rebuild a full state document from the last one plus a stateDelta.
+// Returns null when the delta doesn't match our snapshot (caller resyncs).
+function applyStateDelta(base, d){
+  if (!base || typeof base.seq !== "number" || d.base !== base.seq) return null;
+  const byGuid = new Map();
+  for (const t of (base.tracks||[])) byGuid.set(t.guid, t);
+  for (const g of (d.removed||[])) byGuid.delete(g);
+  for (const t of (d.added||[])) byGuid.set(t.guid, t);
+  for (const c of (d.changed||[])){
+    const prev = byGuid.get(c.guid);
+    if (!prev) return null;
+    byGuid.set(c.guid, { ...prev, ...c });
+  }
+  const order = Array.isArray(d.order) ? d.order : (base.tracks||[]).map(t=>t.guid);
+  const tracks = [];
+  for (const g of order){
+    const t = byGuid.get(g);
+    if (!t) return null;
+    tracks.push(t);
+  }
+  const next = { ...base, type: "state", tracks, seq: d.seq, ts: d.ts, version: d.version || base.version };
+  for (const k of ["master","projectName","projectPath","transport"]){
+    if (k in d) next[k] = d[k];
+  }
+  return next;
+}
+
+function publishMeter(meter){
+  lastMeter = meter;
+  for (const ws of wsClients){
+    sendTo(ws, filterMeterFor(ws, meter));
+  }
+}
+
+// meterPacked payload (base64): <BHH flags, layout id, count> then per slot
+// <HHB pkL, pkR (0..65535), clip (0 = none, else dB*10)>; slots map to
+// meterLayout.guids. With flags bit 0 (sparse) every slot is prefixed by its
+// uint16 slot index and only changed tracks are listed.
+let meterLayout = null;
+function unpackMeter(msg){
+  if (!meterLayout) return null;
+  let buf;
+  try{ buf = Buffer.from(String(msg.data||""), "base64"); }catch{ return null; }
+  if (buf.length < 5) return null;
+  const sparse = (buf.readUInt8(0) & 1) !== 0;
+  const layoutId = buf.readUInt16LE(1);
+  const n = buf.readUInt16LE(3);
+  if (layoutId !== meterLayout.id) return null;
+  const size = sparse ? 7 : 5;
+  const frames = [];
+  for (let i = 0; i < n; i++){
+    let o = 5 + i * size;
+    if (o + size > buf.length) break;
+    let slot = i;
+    if (sparse){ slot = buf.readUInt16LE(o); o += 2; }
+    const guid = meterLayout.guids[slot];
+    if (guid === undefined) continue;
+    const clip = buf.readUInt8(o + 4);
+    frames.push({ guid, pkL: buf.readUInt16LE(o) / 65535, pkR: buf.readUInt16LE(o + 2) / 65535, clipDb: clip ? clip / 10 : null });
+  }
+  return { type: "meter", frames, keyframe: !sparse, ts: msg.ts, version: msg.version };
+}
+
+let lastResyncReq = 0;
+function requestStateResync(sock){
+  const now = Date.now();
+  if (now - lastResyncReq < 500) return;
+  lastResyncReq = now;
+  try{ sock.write(JSON.stringify({type:"reqState"}) + "\n"); }catch{}
+}
+
+// telemetry frames carry one normalized value row per FX in telemetryLayout
+// order; clients get them expanded to {guid, fxIndex, name, values: {label:
+// value}} in the slider's units (dB for GR/Atten) using the layout's min/max
+let telemetryLayout = null;
+function expandTelemetry(msg){
+  if (!telemetryLayout || Number(msg.id) !== telemetryLayout.id) return null;
+  const rows = Array.isArray(msg.v) ? msg.v : [];
+  const frames = telemetryLayout.fx.map((fx, i)=>{
+    const row = rows[i] || [];
+    const values = {};
+    (fx.labels||[]).forEach((label, k)=>{
+      const lo = Number((fx.min||[])[k]) || 0;
+      const hi = Number.isFinite(Number((fx.max||[])[k])) ? Number(fx.max[k]) : 1;
+      values[label] = lo + (Number(row[k]) || 0) * (hi - lo);
+    });
+    return { guid: fx.guid, fxIndex: fx.fxIndex, name: fx.name, params: fx.params, values };
+  });
+  return { type:"telemetry", ts: msg.ts, frames };
+}
+
+function toReaper(obj){
+  if (!reaperSock) return;
+  try{ reaperSock.write(JSON.stringify(obj) + "\n"); }catch{}
+}
+
+// ---- replies routed to the requester ----
+// Commands whose reply only the sender may see are forwarded with a server
+// id (REAPER echoes "id"); the reply goes back to that client with its own id.
+const REPLY_TIMEOUT_MS = 10000;
+const routedCmds = new Set(["batch","reqLog","setCapture","setApiTrace","reqApiTrace","reqStats","setProfile"]);
+const routedReplies = new Set(["batchResult","log","captureStatus","apiTrace"]);
+const pendingReplies = new Map(); // server id -> {ws, id, ts}
+let replySeq = 0;
+// admin sockets that asked for stats (reqStats/setProfile; {watch:false} stops)
+// get the periodic pushes, which carry no id
+const statsWatchers = new Set();
+
+function expectReply(ws, msg){
+  const id = `r${++replySeq}`;
+  pendingReplies.set(id, {ws, id: msg.id === undefined ? null : msg.id, ts: Date.now()});
+  return {...msg, id};
+}
+
+function routeReply(msg){
+  const key = String(msg.id);
+  const p = pendingReplies.get(key);
+  if (!p) return false;
+  pendingReplies.delete(key);
+  sendTo(p.ws, {...msg, id: p.id});
+  return true;
+}
+
+setInterval(()=>{
+  const now = Date.now();
+  for (const [id, p] of Array.from(pendingReplies)){
+    if (now - p.ts > REPLY_TIMEOUT_MS) pendingReplies.delete(id);
+  }
+}, 1000);
+
+// ---- FX parameter subscriptions ----
+// Clients subscribe explicitly (subscribeFxParams) or keep polling
+// reqFxParams; a poll becomes a lease that is renewed by the next poll and
+// answered from the cached param list. REAPER pushes fxParamDelta for
+// subscribed FX; it is folded into the cache and forwarded as is to the
+// clients holding that subscription or lease, which patch their own copy.
+// The REAPER rate follows the fastest remaining client, up and down.
+const FX_LEASE_MS = 3000;
+const FX_RATE_SLOW = 10;     // Hz, list views and explicit subscribers without a rate
+const FX_RATE_FAST = 30;     // Hz, layout views polling for meters
+const FX_FAST_POLL_MS = 100; // a lease polled more often than this gets FX_RATE_FAST
+const fxSubs = new Map(); // "guid:fxIndex" -> {guid, fxIndex, rate, params, clients, leases, rates}
+let fxSubRejectUntil = 0; // REAPER refused a subscription (cap); plain polling until then
+
+function fxSubKey(guid, fxIndex){
+  return `${String(guid||"")}:${Number(fxIndex)||0}`;
+}
+
+function fxPollRate(lastPoll){
+  return (lastPoll && Date.now() - lastPoll < FX_FAST_POLL_MS) ? FX_RATE_FAST : FX_RATE_SLOW;
+}
+
+// ask REAPER for the fastest rate any remaining client wants (re-subscribing
+// with a new rate is allowed and also refreshes the baseline)
+function fxApplyRate(sub){
+  let rate = 0;
+  for (const r of sub.rates.values()) rate = Math.max(rate, r);
+  if (!rate || rate === sub.rate) return;
+  sub.rate = rate;
+  toReaper({type:"subscribeFxParams", guid: sub.guid, fxIndex: sub.fxIndex, rate});
+}
+
+function fxSubscribe(ws, guid, fxIndex, rate, lease){
+  const key = fxSubKey(guid, fxIndex);
+  let sub = fxSubs.get(key);
+  if (!sub){
+    sub = { guid: String(guid||""), fxIndex: Number(fxIndex)||0, rate: 0, params: null,
+            clients: new Set(), leases: new Map(), rates: new Map() };
+    fxSubs.set(key, sub);
+  }
+  if (lease) sub.leases.set(ws, Date.now());
+  else sub.clients.add(ws);
+  // an explicit subscription is not lowered by the same client's polls
+  rate = Number(rate) || FX_RATE_SLOW;
+  if (lease && sub.clients.has(ws)) rate = Math.max(rate, sub.rates.get(ws) || 0);
+  sub.rates.set(ws, rate);
+  fxApplyRate(sub);
+  return sub;
+}
+
+function fxRelease(ws, sub){
+  sub.clients.delete(ws);
+  sub.leases.delete(ws);
+  sub.rates.delete(ws);
+  if (sub.clients.size || sub.leases.size){
+    fxApplyRate(sub);
+    return;
+  }
+  fxSubs.delete(fxSubKey(sub.guid, sub.fxIndex));
+  toReaper({type:"unsubscribeFxParams", guid: sub.guid, fxIndex: sub.fxIndex});
+}
+
+function fxSendToSubscribers(sub, msg){
+  for (const ws of sub.clients) sendTo(ws, msg);
+  for (const ws of sub.leases.keys()){
+    if (!sub.clients.has(ws)) sendTo(ws, msg);
+  }
+}
+
+setInterval(()=>{
+  const now = Date.now();
+  for (const sub of Array.from(fxSubs.values())){
+    for (const [ws, ts] of Array.from(sub.leases)){
+      if (now - ts > FX_LEASE_MS) fxRelease(ws, sub);
+    }
+  }
+}, 1000);
+
+// ---- spectrum subscriptions (RM_EQ2/EQ4 analyzer) ----
+// One REAPER subscription per EQ instance, shared by the clients that asked
+// for it; spectrum frames (base64, one byte per bin) go to those clients only.
+const specSubs = new Map(); // "guid:fxIndex" -> {guid, fxIndex, rate, clients}
+
+function specSubscribe(ws, guid, fxIndex, rate){
+  const key = fxSubKey(guid, fxIndex);
+  let sub = specSubs.get(key);
+  if (!sub){
+    sub = { guid: String(guid||""), fxIndex: Number(fxIndex)||0, rate: 0, clients: new Set() };
+    specSubs.set(key, sub);
+  }
+  sub.clients.add(ws);
+  rate = Number(rate) || 15;
+  if (rate > sub.rate){
+    sub.rate = rate;
+    toReaper({type:"subscribeSpectrum", guid: sub.guid, fxIndex: sub.fxIndex, rate});
+  }
+}
+
+function specRelease(ws, sub){
+  sub.clients.delete(ws);
+  if (sub.clients.size) return;
+  specSubs.delete(fxSubKey(sub.guid, sub.fxIndex));
+  toReaper({type:"unsubscribeSpectrum", guid: sub.guid, fxIndex: sub.fxIndex});
+}
+
+function applyFxParamDelta(sub, msg){
+  if (!sub.params) return;
+  for (const [i, value, fmt, raw] of (msg.p || [])){
+    const p = (sub.params[i] && sub.params[i].index === i) ? sub.params[i] : sub.params.find(q => q.index === i);
+    if (!p) continue;
+    p.value = value;
+    p.fmt = fmt;
+    p.raw = raw;
+  }
+}
+
 const tcpServer = net.createServer((sock) => {
   console.log("REAPER connected via TCP");
   reaperSock = sock;
@@ -395,35 +720,113 @@ const tcpServer = net.createServer((sock) => {
       if (!msg || !msg.type) continue;
 
       if (msg.type === "state"){
-        // update project
-        const pName = msg.projectName || "Untitled";
-        const pPath = msg.projectPath || "";
-        const pid = getProjectId(pPath, pName);
-        const changed = (pid !== currentProjectId);
-        currentProjectId = pid;
-        currentProjectName = pName;
-        currentProjectPath = pPath;
-        const cfg = ensureProjectCfg(currentProjectId);
-        cfg.projectName = currentProjectName;
-        projects[currentProjectId] = cfg;
-        if (changed) broadcastProjectInfo();
-
-        lastState = msg;
-        // broadcast filtered
-        for (const ws of wsClients){
-          sendTo(ws, filterStateFor(ws, msg));
+        publishState(msg);
+        continue;
+      }
+
+      if (msg.type === "stateDelta"){
+        // deltas only apply on top of the exact snapshot they were built from
+        const next = applyStateDelta(lastState, msg);
+        if (!next){
+          requestStateResync(sock);
+          continue;
+        }
+        publishState(next);
+        continue;
+      }
+
+      if (msg.type === "hello"){
+        // negotiate compact meters when the script supports them
+        if (Array.isArray(msg.meterFormats) && msg.meterFormats.includes("packed")){
+          try{ sock.write(JSON.stringify({type:"setMeterFormat", format:"packed"}) + "\n"); }catch{}
+        }
+        meterLayout = null;
+        telemetryLayout = null;
+        // a fresh script instance has no subscriptions; restore ours
+        for (const sub of fxSubs.values()){
+          sub.params = null;
+          try{ sock.write(JSON.stringify({type:"subscribeFxParams", guid: sub.guid, fxIndex: sub.fxIndex, rate: sub.rate}) + "\n"); }catch{}
+        }
+        for (const sub of specSubs.values()){
+          try{ sock.write(JSON.stringify({type:"subscribeSpectrum", guid: sub.guid, fxIndex: sub.fxIndex, rate: sub.rate}) + "\n"); }catch{}
+        }
+        for (const ws of wsClients) sendTo(ws, msg);
+        continue;
+      }
+
+      if (msg.type === "fxParams"){
+        const sub = fxSubs.get(fxSubKey(msg.guid, msg.fxIndex));
+        if (sub){
+          sub.params = Array.isArray(msg.params) ? msg.params : [];
+          fxSendToSubscribers(sub, msg);
+          continue;
         }
+      }
+
+      if (msg.type === "fxParamDelta"){
+        const sub = fxSubs.get(fxSubKey(msg.guid, msg.fxIndex));
+        if (!sub) continue;
+        applyFxParamDelta(sub, msg);
+        fxSendToSubscribers(sub, msg);
+        continue;
+      }
+
+      if (msg.type === "spectrum" || msg.type === "spectrumSubscribed"){
+        const key = fxSubKey(msg.guid, msg.fxIndex);
+        const sub = specSubs.get(key);
+        if (!sub) continue;
+        for (const ws of sub.clients) sendTo(ws, msg);
+        if (msg.type === "spectrumSubscribed" && !msg.ok) specSubs.delete(key);
+        continue;
+      }
+
+      if (msg.type === "fxParamsSubscribed" && !msg.ok){
+        fxSubs.delete(fxSubKey(msg.guid, msg.fxIndex));
+        fxSubRejectUntil = Date.now() + 5000;
+      }
+
+      if (msg.type === "meterLayout"){
+        meterLayout = { id: Number(msg.id), guids: Array.isArray(msg.guids) ? msg.guids : [] };
+        continue;
+      }
+
+      if (msg.type === "meterPacked"){
+        const meter = unpackMeter(msg);
+        if (meter) publishMeter(meter);
         continue;
       }
 
       if (msg.type === "meter"){
-        lastMeter = msg;
-        for (const ws of wsClients){
-          sendTo(ws, filterMeterFor(ws, msg));
+        publishMeter(msg);
+        continue;
+      }
+
+      if (msg.type === "telemetryLayout"){
+        telemetryLayout = { id: Number(msg.id), fx: Array.isArray(msg.fx) ? msg.fx : [] };
+        continue;
+      }
+
+      if (msg.type === "telemetry"){
+        const tel = expandTelemetry(msg);
+        if (tel) for (const ws of wsClients){
+          const own = filterMeterFor(ws, tel);
+          if (own.frames.length) sendTo(ws, own);
         }
         continue;
       }
 
+      if (msg.type === "stats"){
+        if (msg.id != null && routeReply(msg)) continue;
+        for (const ws of statsWatchers) if (isAdmin(ws)) sendTo(ws, msg);
+        continue;
+      }
+
+      if (routedReplies.has(msg.type)){
+        // only the client that asked; never the default broadcast
+        routeReply(msg);
+        continue;
+      }
+
       if (msg.type === "fxList"){
         // only send to users who can see this track
         for (const ws of wsClients){
@@ -448,6 +851,7 @@ const tcpServer = net.createServer((sock) => {
   sock.on("close", () => {
     console.log("REAPER TCP disconnected");
     if (reaperSock === sock) reaperSock = null;
+    pendingReplies.clear();
   });
 
   sock.on("error", (e) => {